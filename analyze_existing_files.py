@@ -6,16 +6,62 @@ This script will analyze the files you've already preserved to understand the au
 
 import json
 import os
+import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import av
 import numpy as np
+import soundfile as sf
+from numba import njit
 
 # Default preserved files directory
 PRESERVED_FILES_DIR = os.path.expanduser("~/Documents/Friday_Transcription_Files")
 
-def analyze_audio_file(file_path):
-    """Analyze a single audio file for content"""
+# Seconds of audio read from the start of each file for content analysis
+ANALYSIS_SECONDS = 5.0
+
+@njit(cache=True, fastmath=True)
+def _reduce_frame(buf, thresh):
+    """Single pass over a mono buffer returning (max_abs, sum_sq, silent_count)"""
+    max_abs = 0.0
+    sum_sq = 0.0
+    silent = 0
+    for i in range(buf.shape[0]):
+        v = buf[i]
+        a = abs(v)
+        if a > max_abs:
+            max_abs = a
+        sum_sq += v * v
+        if a < thresh:
+            silent += 1
+    return max_abs, sum_sq, silent
+
+# Compile once at import so the first file doesn't pay the JIT cost
+_reduce_frame(np.zeros(1, dtype=np.float32), 0.01)
+
+# Sidecar cache of per-file results, keyed by path and invalidated on (mtime, size)
+ANALYSIS_CACHE_NAME = ".analysis_cache.db"
+
+def open_analysis_cache(directory):
+    """Open (and create if needed) the analysis cache database for a directory"""
+    conn = sqlite3.connect(os.path.join(directory, ANALYSIS_CACHE_NAME))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS analysis "
+        "(path TEXT PRIMARY KEY, mtime REAL, size INTEGER, json TEXT)"
+    )
+    return conn
+
+def get_cached_analysis(conn, path, stat):
+    """Return the cached analysis for path if the file is unchanged, else None"""
+    row = conn.execute(
+        "SELECT mtime, size, json FROM analysis WHERE path = ?", (path,)
+    ).fetchone()
+    if row and row[0] == stat.st_mtime and row[1] == stat.st_size:
+        return json.loads(row[2])
+    return None
+
+def analyze_audio_file(file_path, file_size=None):
+    """Analyze a single audio file for content; file_size can be passed in if already known"""
     analysis = {
         "has_audio": False,
         "duration": 0,
@@ -30,58 +76,26 @@ def analyze_audio_file(file_path):
     }
     
     try:
-        analysis["file_size"] = os.path.getsize(file_path)
-        
-        container = av.open(str(file_path))
-        audio_streams = [s for s in container.streams if s.type == 'audio']
-        
-        if not audio_streams:
-            analysis["error"] = "No audio streams found"
-            container.close()
-            return analysis
-        
-        audio_stream = audio_streams[0]
-        analysis["has_audio"] = True
-        analysis["duration"] = float(audio_stream.duration * audio_stream.time_base) if audio_stream.duration else 0
-        analysis["sample_rate"] = audio_stream.sample_rate
-        analysis["channels"] = audio_stream.channels
-        analysis["audio_format"] = audio_stream.codec.name
-        
-        # Analyze audio content by reading samples
-        frames_analyzed = 0
-        total_samples = 0
-        sum_squares = 0
-        max_amplitude = 0
-        silent_samples = 0
+        analysis["file_size"] = os.path.getsize(file_path) if file_size is None else file_size
         
-        # Read up to 5 seconds of audio for analysis
-        max_frames = int(5 * audio_stream.sample_rate) if audio_stream.sample_rate else 80000
-        
-        for frame in container.decode(audio_stream):
-            if frames_analyzed >= max_frames:
-                break
-                
-            # Convert frame to numpy array for analysis
-            audio_array = frame.to_ndarray()
-            if len(audio_array.shape) > 1:
-                # Multi-channel: take mean across channels
-                audio_array = audio_array.mean(axis=0)
-            
-            # Calculate statistics
-            frame_samples = len(audio_array)
-            total_samples += frame_samples
-            frames_analyzed += frame_samples
-            
-            # Calculate RMS and max amplitude
-            abs_samples = abs(audio_array)
-            max_amplitude = max(max_amplitude, abs_samples.max() if len(abs_samples) > 0 else 0)
-            sum_squares += (audio_array ** 2).sum()
+        with sf.SoundFile(str(file_path)) as f:
+            sr = f.samplerate
+            analysis["has_audio"] = True
+            analysis["duration"] = f.frames / sr if sr else 0
+            analysis["sample_rate"] = sr
+            analysis["channels"] = f.channels
+            analysis["audio_format"] = f.subtype.lower()
             
-            # Count silent samples (below threshold)
-            silence_threshold = 0.01  # 1% of max amplitude
-            silent_samples += (abs_samples < silence_threshold).sum()
+            # Read up to ANALYSIS_SECONDS of audio; frames count per-channel sample groups
+            data = f.read(frames=int(ANALYSIS_SECONDS * sr), dtype='float32', always_2d=True)
         
-        container.close()
+        # Multi-channel: take mean across channels
+        samples = data.mean(axis=1, dtype=np.float32) if data.shape[1] > 1 else data[:, 0]
+        total_samples = len(samples)
+        
+        # Calculate RMS, max amplitude and silent samples (below threshold)
+        silence_threshold = 0.01  # 1% of max amplitude
+        max_amplitude, sum_squares, silent_samples = _reduce_frame(samples, silence_threshold)
         
         if total_samples > 0:
             analysis["max_amplitude"] = float(max_amplitude)
@@ -126,8 +140,13 @@ def analyze_existing_files():
     print(f"🔍 Analyzing existing preserved files in: {PRESERVED_FILES_DIR}")
     print("=" * 80)
     
-    # Find all WAV files
-    wav_files = list(Path(PRESERVED_FILES_DIR).glob("*.wav"))
+    # Find all WAV files; scandir hands back each file's stat for free
+    with os.scandir(PRESERVED_FILES_DIR) as it:
+        wav_entries = sorted(((Path(entry.path), entry.stat()) for entry in it
+                              if entry.name.endswith(".wav") and entry.is_file()),
+                             key=lambda item: item[0].name)
+    wav_files = [file_path for file_path, _ in wav_entries]
+    file_stats = [stat for _, stat in wav_entries]
     
     if not wav_files:
         print("No WAV files found to analyze")
@@ -147,10 +166,37 @@ def analyze_existing_files():
     print(f"Found {len(wav_files)} files to analyze...")
     print()
     
-    for i, file_path in enumerate(wav_files):
-        print(f"Analyzing ({i+1}/{len(wav_files)}): {file_path.name}")
+    # Reuse cached results for unchanged files and only analyze the rest
+    cache = open_analysis_cache(PRESERVED_FILES_DIR)
+    analyses = [get_cached_analysis(cache, str(file_path), stat)
+                for file_path, stat in zip(wav_files, file_stats)]
+    misses = [i for i, analysis in enumerate(analyses) if analysis is None]
+    
+    if misses:
+        print(f"Analyzing {len(misses)} new or changed files ({len(wav_files) - len(misses)} cached)...")
+        print()
+        
+        # Each file is analyzed in its own process; results come back in input order
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            analyses_iter = executor.map(analyze_audio_file,
+                                         [wav_files[i] for i in misses],
+                                         [file_stats[i].st_size for i in misses],
+                                         chunksize=4)
+            for i, analysis in zip(misses, analyses_iter):
+                analyses[i] = analysis
+        
+        # Write back in a single transaction; errors are not cached so they get retried
+        with cache:
+            cache.executemany(
+                "INSERT OR REPLACE INTO analysis (path, mtime, size, json) VALUES (?, ?, ?, ?)",
+                [(str(wav_files[i]), file_stats[i].st_mtime, file_stats[i].st_size, json.dumps(analyses[i]))
+                 for i in misses if not analyses[i].get("error")]
+            )
+    cache.close()
+    
+    for i, (file_path, analysis) in enumerate(zip(wav_files, analyses)):
+        print(f"Analyzed ({i+1}/{len(wav_files)}): {file_path.name}")
         
-        analysis = analyze_audio_file(file_path)
         category = categorize_audio_quality(analysis)
         
         result = {
@@ -4,15 +4,24 @@ Analyze preserved transcription files
 Utility to help analyze the files that were sent for transcription
 """
 
-import json
+import mmap
 import os
 import sys
 from datetime import datetime
-from pathlib import Path
+import numpy as np
+import orjson
 
 # Default preserved files directory
 PRESERVED_FILES_DIR = os.path.expanduser("~/Documents/Friday_Transcription_Files")
 
+def iter_log_lines(log_file_path):
+    """Yield raw lines of a JSON-lines log via mmap, without per-line decode/copy through a read buffer"""
+    with open(log_file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # mmap can't map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter(mm.readline, b'')
+
 def analyze_log_file(log_file_path):
     """Analyze the transcription log file"""
     if not os.path.exists(log_file_path):
@@ -22,91 +31,91 @@ def analyze_log_file(log_file_path):
     print(f"📊 Analyzing transcription log: {log_file_path}")
     print("=" * 80)
     
-    total_entries = 0
-    system_entries = 0
-    microphone_entries = 0
-    error_entries = 0
-    short_duration_entries = 0
-    no_audio_stream_entries = 0
-    mostly_silent_entries = 0
-    successful_transcriptions = 0
-    
-    total_file_size = 0
-    stream_type_sizes = {"system": 0, "microphone": 0}
-    
-    # Audio quality statistics
-    audio_quality_stats = {
-        "total_with_analysis": 0,
-        "good_audio": 0,
-        "mostly_silent": 0,
-        "very_quiet": 0,
-        "short_duration": 0,
-        "analysis_errors": 0
-    }
+    # Columns collected in one parse pass, then bucketed with numpy masks
+    stream_type_values = []
+    transcript_prefixes = []
+    file_size_values = []
+    silence_values = []
+    max_amp_values = []
+    rms_values = []
+    duration_values = []
     
     try:
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                    
-                try:
-                    entry = json.loads(line)
-                    total_entries += 1
-                    
-                    # Count by stream type
-                    stream_type = entry.get('stream_type', 'unknown')
-                    if stream_type == 'system':
-                        system_entries += 1
-                    elif stream_type == 'microphone':
-                        microphone_entries += 1
-                    
-                    # Count by result type
-                    transcript = entry.get('transcript', '')
-                    if transcript.startswith('ERROR:'):
-                        error_entries += 1
-                    elif transcript.startswith('SHORT_DURATION'):
-                        short_duration_entries += 1
-                    elif transcript == 'NO_AUDIO_STREAMS':
-                        no_audio_stream_entries += 1
-                    elif transcript.startswith('MOSTLY_SILENT'):
-                        mostly_silent_entries += 1
-                    elif transcript and not transcript.startswith('ERROR:'):
-                        successful_transcriptions += 1
-                    
-                    # Analyze audio analysis data if present
-                    audio_analysis = entry.get('audio_analysis')
-                    if audio_analysis:
-                        audio_quality_stats["total_with_analysis"] += 1
-                        
-                        silence_pct = audio_analysis.get('silence_percentage', 100)
-                        max_amp = audio_analysis.get('max_amplitude', 0)
-                        rms = audio_analysis.get('rms_level', 0)
-                        duration = audio_analysis.get('duration', 0)
-                        
-                        if duration < 0.1:
-                            audio_quality_stats["short_duration"] += 1
-                        elif silence_pct > 95 or max_amp < 0.001 or rms < 0.0001:
-                            audio_quality_stats["mostly_silent"] += 1
-                        elif silence_pct > 80 or max_amp < 0.01 or rms < 0.001:
-                            audio_quality_stats["very_quiet"] += 1
-                        else:
-                            audio_quality_stats["good_audio"] += 1
-                    
-                    # Sum file sizes
-                    file_size = entry.get('file_size', 0)
-                    total_file_size += file_size
-                    if stream_type in stream_type_sizes:
-                        stream_type_sizes[stream_type] += file_size
-                    
-                except json.JSONDecodeError as e:
-                    print(f"⚠️ Error parsing line: {e}")
-                    continue
+        for line in iter_log_lines(log_file_path):
+            if not line.strip():
+                continue
+                
+            try:
+                entry = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                print(f"⚠️ Error parsing line: {e}")
+                continue
+            
+            stream_type_values.append(entry.get('stream_type', 'unknown'))
+            transcript_prefixes.append(entry.get('transcript', '')[:20])
+            file_size_values.append(entry.get('file_size', 0))
+            
+            audio_analysis = entry.get('audio_analysis')
+            if audio_analysis:
+                silence_values.append(audio_analysis.get('silence_percentage', 100))
+                max_amp_values.append(audio_analysis.get('max_amplitude', 0))
+                rms_values.append(audio_analysis.get('rms_level', 0))
+                duration_values.append(audio_analysis.get('duration', 0))
     
     except Exception as e:
         print(f"❌ Error reading log file: {e}")
         return
     
+    total_entries = len(stream_type_values)
+    stream_types = np.array(stream_type_values, dtype=str)
+    transcripts = np.array(transcript_prefixes, dtype=str)
+    file_sizes = np.array(file_size_values, dtype=np.int64)
+    
+    # Count by stream type
+    system_mask = stream_types == 'system'
+    microphone_mask = stream_types == 'microphone'
+    system_entries = int(np.count_nonzero(system_mask))
+    microphone_entries = int(np.count_nonzero(microphone_mask))
+    
+    # Count by result type; each mask excludes the ones before it
+    error_mask = np.char.startswith(transcripts, 'ERROR:')
+    short_mask = ~error_mask & np.char.startswith(transcripts, 'SHORT_DURATION')
+    no_audio_mask = ~error_mask & ~short_mask & (transcripts == 'NO_AUDIO_STREAMS')
+    silent_mask = ~error_mask & ~short_mask & ~no_audio_mask & np.char.startswith(transcripts, 'MOSTLY_SILENT')
+    unsuccessful_mask = error_mask | short_mask | no_audio_mask | silent_mask
+    
+    error_entries = int(np.count_nonzero(error_mask))
+    short_duration_entries = int(np.count_nonzero(short_mask))
+    no_audio_stream_entries = int(np.count_nonzero(no_audio_mask))
+    mostly_silent_entries = int(np.count_nonzero(silent_mask))
+    successful_transcriptions = int(np.count_nonzero(~unsuccessful_mask & (transcripts != '')))
+    
+    # Sum file sizes
+    total_file_size = int(file_sizes.sum())
+    stream_type_sizes = {
+        "system": int(file_sizes[system_mask].sum()),
+        "microphone": int(file_sizes[microphone_mask].sum())
+    }
+    
+    # Audio quality statistics
+    silence = np.asarray(silence_values, dtype=np.float64)
+    max_amp = np.asarray(max_amp_values, dtype=np.float64)
+    rms = np.asarray(rms_values, dtype=np.float64)
+    duration = np.asarray(duration_values, dtype=np.float64)
+    
+    too_short = duration < 0.1
+    too_silent = ~too_short & ((silence > 95) | (max_amp < 0.001) | (rms < 0.0001))
+    too_quiet = ~too_short & ~too_silent & ((silence > 80) | (max_amp < 0.01) | (rms < 0.001))
+    
+    audio_quality_stats = {
+        "total_with_analysis": len(duration_values),
+        "good_audio": int(np.count_nonzero(~(too_short | too_silent | too_quiet))),
+        "mostly_silent": int(np.count_nonzero(too_silent)),
+        "very_quiet": int(np.count_nonzero(too_quiet)),
+        "short_duration": int(np.count_nonzero(too_short)),
+        "analysis_errors": 0
+    }
+    
     print(f"📈 SUMMARY:")
     print(f"  Total entries: {total_entries}")
     print(f"  System audio files: {system_entries}")
@@ -144,8 +153,11 @@ def list_preserved_files(directory):
     print(f"📂 Preserved files in: {directory}")
     print("=" * 80)
     
-    files = list(Path(directory).glob("*.wav"))
-    files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+    # One scandir pass; each entry's stat is fetched once and reused below
+    with os.scandir(directory) as it:
+        files = [(entry.stat(), entry.name) for entry in it
+                 if entry.name.endswith(".wav") and entry.is_file()]
+    files.sort(key=lambda x: x[0].st_mtime, reverse=True)
     
     if not files:
         print("  No preserved audio files found")
@@ -155,13 +167,12 @@ def list_preserved_files(directory):
     system_files = 0
     microphone_files = 0
     
-    for file in files[:20]:  # Show last 20 files
-        stat = file.stat()
+    for stat, name in files[:20]:  # Show last 20 files
         size_mb = stat.st_size / (1024 * 1024)
         mtime = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
         
         # Determine stream type from filename
-        stream_type = "system" if "_system_" in file.name else "microphone"
+        stream_type = "system" if "_system_" in name else "microphone"
         if stream_type == "system":
             system_files += 1
         else:
@@ -169,7 +180,7 @@ def list_preserved_files(directory):
         
         total_size += stat.st_size
         
-        print(f"  {file.name} ({size_mb:.2f} MB) - {mtime} - {stream_type}")
+        print(f"  {name} ({size_mb:.2f} MB) - {mtime} - {stream_type}")
     
     if len(files) > 20:
         print(f"  ... and {len(files) - 20} more files")
@@ -191,18 +202,17 @@ def find_recent_errors(log_file_path, limit=10):
     
     errors = []
     try:
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                    
-                try:
-                    entry = json.loads(line)
-                    transcript = entry.get('transcript', '')
-                    if transcript.startswith('ERROR:'):
-                        errors.append(entry)
-                except json.JSONDecodeError:
-                    continue
+        for line in iter_log_lines(log_file_path):
+            if not line.strip():
+                continue
+                
+            try:
+                entry = orjson.loads(line)
+                transcript = entry.get('transcript', '')
+                if transcript.startswith('ERROR:'):
+                    errors.append(entry)
+            except orjson.JSONDecodeError:
+                continue
     except Exception as e:
         print(f"❌ Error reading log file: {e}")
         return
@@ -6,24 +6,85 @@ Process multiple audio files in a directory
 
 import sys
 import os
-import json
 import argparse
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from faster_whisper import WhisperModel
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from faster_whisper import WhisperModel, decode_audio
+import numpy as np
+import orjson
+import soundfile as sf
 import time
 
 # Audio file extensions supported by Whisper
 SUPPORTED_EXTENSIONS = {'.mp3', '.wav', '.flac', '.m4a', '.mp4', '.webm', '.ogg'}
 
-def transcribe_file(model, file_path, output_dir, output_format):
-    """Transcribe a single file"""
+# Whisper's input sample rate, and the formats libsndfile can read without ffmpeg
+WHISPER_SAMPLE_RATE = 16000
+SOUNDFILE_EXTENSIONS = {'.wav', '.flac', '.ogg'}
+
+# Multilingual Whisper sizes, plus English-only distilled models with about half
+# the decoder cost of the matching size
+MODEL_CHOICES = ['tiny', 'base', 'small', 'medium', 'large',
+                 'distil-small.en', 'distil-medium.en', 'distil-large-v3']
+
+# Per-process model, created by the pool initializer in each worker
+_worker_model = None
+
+def load_model(model_size, cpu_threads=0):
+    """Load the Whisper model used for batch transcription"""
+    return WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+
+def _init_worker(model_size, cpu_threads):
+    """Process pool initializer: load one model per worker process"""
+    global _worker_model
+    _worker_model = load_model(model_size, cpu_threads)
+
+def _transcribe_in_worker(file_path, output_dir, output_format):
+    """Transcribe a file with this worker's own model"""
+    return transcribe_file(_worker_model, file_path, output_dir, output_format)
+
+def prepare_audio(file_path):
+    """Decode a file to the 16 kHz mono float32 array Whisper expects"""
+    # Files already at 16 kHz are read directly with libsndfile, skipping ffmpeg
+    if file_path.suffix.lower() in SOUNDFILE_EXTENSIONS:
+        try:
+            if sf.info(str(file_path)).samplerate == WHISPER_SAMPLE_RATE:
+                samples, _ = sf.read(str(file_path), dtype='float32', always_2d=False)
+                if samples.ndim > 1:
+                    samples = samples.mean(axis=1, dtype=np.float32)
+                return samples
+        except RuntimeError:
+            pass  # Let ffmpeg have a go at anything libsndfile can't parse
+    
+    return decode_audio(str(file_path), sampling_rate=WHISPER_SAMPLE_RATE)
+
+def prefetch_audio(audio_files):
+    """Yield (file_path, audio) pairs, decoding the next file while the current one is transcribed"""
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending = None
+        for file_path in audio_files:
+            future = prefetcher.submit(prepare_audio, file_path)
+            if pending is not None:
+                yield pending[0], _prefetched_result(pending[1])
+            pending = (file_path, future)
+        if pending is not None:
+            yield pending[0], _prefetched_result(pending[1])
+
+def _prefetched_result(future):
+    """On a decode error return None so transcribe_file retries and reports it"""
+    return future.result() if future.exception() is None else None
+
+def transcribe_file(model, file_path, output_dir, output_format, audio=None):
+    """Transcribe a single file, optionally from already decoded audio"""
     try:
         print(f"🔄 Transcribing: {file_path.name}")
         
+        if audio is None:
+            audio = prepare_audio(file_path)
+        
         # Transcribe with optimized settings
         segments, info = model.transcribe(
-            str(file_path),
+            audio,
             beam_size=3,  # Balanced speed vs quality for batch
             language="en",
             condition_on_previous_text=True,
@@ -34,7 +95,6 @@ def transcribe_file(model, file_path, output_dir, output_format):
         
         # Collect segments
         transcript_segments = []
-        full_text = ""
         
         for segment in segments:
             transcript_segments.append({
@@ -42,7 +102,8 @@ def transcribe_file(model, file_path, output_dir, output_format):
                 "end": segment.end,
                 "text": segment.text.strip()
             })
-            full_text += segment.text + " "
+        
+        full_text = " ".join(segment["text"] for segment in transcript_segments)
         
         result = {
             "file": str(file_path),
@@ -51,7 +112,7 @@ def transcribe_file(model, file_path, output_dir, output_format):
             "language_probability": info.language_probability,
             "duration": info.duration,
             "segments": transcript_segments,
-            "full_text": full_text.strip()
+            "full_text": full_text
         }
         
         # Save output
@@ -59,8 +120,8 @@ def transcribe_file(model, file_path, output_dir, output_format):
         
         if output_format == 'json':
             output_file = output_file.with_suffix('.json')
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
         
         elif output_format == 'srt':
             output_file = output_file.with_suffix('.srt')
@@ -112,16 +173,28 @@ def format_timestamp(seconds):
     millis = int((seconds % 1) * 1000)
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
-def find_audio_files(directory):
-    """Find all audio files in directory"""
-    audio_files = []
-    directory = Path(directory)
-    
-    for file_path in directory.rglob('*'):
-        if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS:
-            audio_files.append(file_path)
-    
-    return sorted(audio_files)
+def find_audio_files(directory, recursive=True):
+    """Yield audio files in directory as they are found, in sorted order per directory"""
+    exts = SUPPORTED_EXTENSIONS
+    stack = [str(directory)]
+    while stack:
+        files = []
+        subdirs = []
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                # Extension check is a string op; only matching names cost a stat
+                name = entry.name
+                dot = name.rfind('.')
+                if dot > 0 and name[dot:].lower() in exts:
+                    if entry.is_file():
+                        files.append(entry.path)
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+        
+        for path in sorted(files):
+            yield Path(path)
+        # Reversed so subdirectories are visited in sorted order
+        stack.extend(sorted(subdirs, reverse=True))
 
 def main():
     parser = argparse.ArgumentParser(description="Batch transcribe audio files using Friday's Whisper model")
@@ -129,10 +202,12 @@ def main():
     parser.add_argument("-o", "--output-dir", help="Output directory (default: same as input)")
     parser.add_argument("-f", "--format", choices=['text', 'json', 'srt'], default='text',
                        help="Output format (default: text)")
-    parser.add_argument("-m", "--model", choices=['tiny', 'base', 'small', 'medium', 'large'], 
+    parser.add_argument("-m", "--model", choices=MODEL_CHOICES, 
                        default='small', help="Whisper model size (default: small)")
     parser.add_argument("-j", "--jobs", type=int, default=2,
-                       help="Number of parallel jobs (default: 2)")
+                       help="Number of worker processes (default: 2). Each worker loads its own "
+                            "model, so memory grows with -j; CPU threads are split between workers. "
+                            "Use -j 1 to run a single model with all CPU threads")
     parser.add_argument("--recursive", action='store_true',
                        help="Search subdirectories recursively")
     
@@ -147,47 +222,47 @@ def main():
     output_dir = Path(args.output_dir) if args.output_dir else input_dir
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Find audio files
+    # Find audio files lazily so transcription starts with the first file found
     print(f"🔍 Searching for audio files in: {input_dir}")
-    if args.recursive:
-        audio_files = find_audio_files(input_dir)
-    else:
-        audio_files = [f for f in input_dir.iterdir() 
-                      if f.is_file() and f.suffix.lower() in SUPPORTED_EXTENSIONS]
-        audio_files.sort()
-    
-    if not audio_files:
-        print("❌ No audio files found")
-        sys.exit(1)
-    
-    print(f"📁 Found {len(audio_files)} audio files")
-    
-    # Load model once for all files
-    print(f"🎤 Loading Whisper model ({args.model})...")
-    model = WhisperModel(args.model, device="cpu", compute_type="int8")
+    audio_files = find_audio_files(input_dir, recursive=args.recursive)
     
     # Process files
     start_time = time.time()
     results = []
     
-    if args.jobs == 1:
-        # Sequential processing
-        for file_path in audio_files:
-            result = transcribe_file(model, file_path, output_dir, args.format)
+    if args.jobs <= 1:
+        # Sequential processing with one model using every CPU thread
+        print(f"🎤 Loading Whisper model ({args.model})...")
+        model = load_model(args.model)
+        for file_path, audio in prefetch_audio(audio_files):
+            result = transcribe_file(model, file_path, output_dir, args.format, audio=audio)
             results.append(result)
     else:
-        # Parallel processing (limited to avoid memory issues)
-        with ThreadPoolExecutor(max_workers=min(args.jobs, len(audio_files))) as executor:
-            # Submit jobs
-            future_to_file = {
-                executor.submit(transcribe_file, model, file_path, output_dir, args.format): file_path
-                for file_path in audio_files
-            }
+        # Worker processes rather than one model shared through num_workers: besides
+        # the CTranslate2 decode, each file goes through Python-side work that holds
+        # the GIL much of the time (audio decoding and resampling, feature extraction,
+        # segment post-processing), and that only overlaps fully across processes.
+        # Each process loads its own model, whose CTranslate2 thread pool gets an
+        # equal share of the CPU threads
+        cpu_threads = max(1, (os.cpu_count() or 1) // args.jobs)
+        print(f"🎤 Loading Whisper model ({args.model}) in {args.jobs} worker processes...")
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                                 initargs=(args.model, cpu_threads)) as executor:
+            # Keep at most jobs * 2 files in flight so memory doesn't grow with the file count
+            in_flight = set()
+            for file_path in audio_files:
+                if len(in_flight) >= args.jobs * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    results.extend(future.result() for future in done)
+                in_flight.add(executor.submit(_transcribe_in_worker, file_path, output_dir, args.format))
             
-            # Collect results
-            for future in as_completed(future_to_file):
-                result = future.result()
-                results.append(result)
+            # Collect remaining results
+            for future in as_completed(in_flight):
+                results.append(future.result())
+    
+    if not results:
+        print("❌ No audio files found")
+        sys.exit(1)
     
     # Summary
     end_time = time.time()
@@ -4,13 +4,17 @@ Friday Ollama Service - Standalone Python Distribution
 This is a self-contained Python script for Ollama integration
 """
 
+import asyncio
 import sys
 import os
+import shutil
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import signal
+import threading
 import argparse
 from typing import Dict, List, Optional, Any
 import logging
@@ -18,24 +22,40 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long the list of locally available models is trusted before re-syncing
+MODEL_CACHE_TTL = 60
+
+# Environment defaults for a spawned `ollama serve`; values already set in the
+# environment take precedence
+OLLAMA_SERVE_ENV_DEFAULTS = {
+    "OLLAMA_NUM_PARALLEL": "4",
+    "OLLAMA_KEEP_ALIVE": "30m",
+}
+
 # Add the bundle directory to Python path
 bundle_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, bundle_dir)
 
 class FridayOllamaService:
-    def __init__(self, api_url: str = "http://localhost:11434", default_model: str = "mistral:7b"):
+    def __init__(self, api_url: str = "http://localhost:11434", default_model: str = "mistral:7b",
+                 keep_alive: str = "30m"):
         self.api_url = api_url
         self.default_model = default_model
+        # How long Ollama keeps the model loaded after each request
+        self.keep_alive = keep_alive
         self.ollama_process = None
         self.is_running = False
+        # Keep-alive session shared by every request to the Ollama API; the pool holds
+        # enough connections for concurrent requests to each reuse their own
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        # Local model names from /api/tags, refreshed every MODEL_CACHE_TTL seconds
+        self._available_models = set()
+        self._models_fetched_at = 0.0
         
     def check_ollama_installed(self) -> bool:
         """Check if Ollama is installed on the system"""
-        try:
-            result = subprocess.run(['which', 'ollama'], capture_output=True, text=True)
-            return result.returncode == 0
-        except Exception:
-            return False
+        return shutil.which("ollama") is not None
     
     def install_ollama(self) -> bool:
         """Install Ollama using the official installer"""
@@ -62,7 +82,7 @@ class FridayOllamaService:
         """Start Ollama service if not already running"""
         try:
             # Check if Ollama is already running
-            response = requests.get(f"{self.api_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.api_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 logger.info("Ollama is already running")
                 self.is_running = True
@@ -74,21 +94,29 @@ class FridayOllamaService:
             # Start Ollama serve
             self.ollama_process = subprocess.Popen(
                 ["ollama", "serve"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                # Ollama logs heavily; unread pipes would fill up and block the server
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                # Own session so terminal signals aren't delivered twice; cleanup() stops it
+                start_new_session=True,
+                close_fds=True,
+                env={**OLLAMA_SERVE_ENV_DEFAULTS, **os.environ}
             )
             
-            # Wait for Ollama to start
-            for _ in range(30):  # Wait up to 30 seconds
+            # Wait up to 30 seconds for Ollama to start, backing off from 25 ms to 500 ms
+            delay = 0.025
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
                 try:
-                    response = requests.get(f"{self.api_url}/api/tags", timeout=2)
+                    response = self._session.get(f"{self.api_url}/api/tags", timeout=2)
                     if response.status_code == 200:
                         logger.info("Ollama started successfully")
                         self.is_running = True
                         return True
                 except requests.RequestException:
-                    time.sleep(1)
+                    pass
+                time.sleep(delay)
+                delay = min(delay * 2, 0.5)
                     
             logger.error("Failed to start Ollama service")
             return False
@@ -97,29 +125,70 @@ class FridayOllamaService:
             logger.error(f"Error starting Ollama: {e}")
             return False
     
+    def _refresh_available_models(self) -> None:
+        """Fetch the names of all local models with a single /api/tags call"""
+        response = self._session.get(f"{self.api_url}/api/tags", timeout=10)
+        if response.status_code == 200:
+            names = set()
+            for entry in response.json().get("models", []):
+                name = entry.get("name", "")
+                names.add(name)
+                # "mistral" and "mistral:latest" refer to the same model
+                if name.endswith(":latest"):
+                    names.add(name[:-len(":latest")])
+            self._available_models = names
+            self._models_fetched_at = time.monotonic()
+    
+    def has_model(self, model: str) -> bool:
+        """Whether /api/tags lists the model locally; never starts a download"""
+        try:
+            self._refresh_available_models()
+        except requests.RequestException as e:
+            logger.warning(f"Could not list local models: {e}")
+            return False
+        return model in self._available_models
+    
     def ensure_model_available(self, model: str) -> bool:
         """Ensure the specified model is available, download if necessary"""
         try:
-            # Check if model exists
-            response = requests.post(
-                f"{self.api_url}/api/show",
-                json={"name": model},
-                timeout=10
-            )
+            # Check the cached model list, re-syncing it once it is stale
+            if time.monotonic() - self._models_fetched_at > MODEL_CACHE_TTL:
+                self._refresh_available_models()
             
-            if response.status_code == 200:
+            if model in self._available_models:
                 return True
                 
             logger.info(f"Model {model} not found, downloading...")
             
-            # Pull the model
-            response = requests.post(
+            # Pull the model, streaming progress events so large downloads aren't cut off
+            # by a whole-request timeout (the timeout applies per read instead)
+            with self._session.post(
                 f"{self.api_url}/api/pull",
-                json={"name": model},
-                timeout=300  # 5 minutes for download
-            )
+                json={"name": model, "stream": True},
+                stream=True,
+                timeout=300
+            ) as response:
+                if response.status_code != 200:
+                    return False
+                
+                last_status = None
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get("error"):
+                        logger.error(f"Error pulling {model}: {event['error']}")
+                        return False
+                    status = event.get("status")
+                    if status and status != last_status:
+                        logger.info(f"{model}: {status}")
+                        last_status = status
+                
+                if last_status != "success":
+                    return False
             
-            return response.status_code == 200
+            self._available_models.add(model)
+            return True
             
         except Exception as e:
             logger.error(f"Error ensuring model {model} is available: {e}")
@@ -137,12 +206,13 @@ class FridayOllamaService:
             return {"success": False, "error": f"Model {model} is not available"}
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.api_url}/api/generate",
                 json={
                     "model": model,
                     "prompt": prompt,
                     "stream": False,
+                    "keep_alive": self.keep_alive,
                     "options": {
                         "temperature": 0.3,
                         "top_k": 40,
@@ -169,6 +239,26 @@ class FridayOllamaService:
         except Exception as e:
             return {"success": False, "error": f"Request error: {str(e)}"}
     
+    def warm_up(self, model: Optional[str] = None) -> bool:
+        """Load the model into memory with a one-token generation so the first real request is fast"""
+        model = model or self.default_model
+        try:
+            response = self._session.post(
+                f"{self.api_url}/api/generate",
+                json={
+                    "model": model,
+                    "prompt": " ",
+                    "stream": False,
+                    "keep_alive": self.keep_alive,
+                    "options": {"num_predict": 1}
+                },
+                timeout=120
+            )
+            return response.status_code == 200
+        except requests.RequestException as e:
+            logger.warning(f"Warm-up request for {model} failed: {e}")
+            return False
+    
     def cleanup(self):
         """Clean up the Ollama process"""
         if self.ollama_process and self.ollama_process.poll() is None:
@@ -181,7 +271,30 @@ class FridayOllamaService:
             self.ollama_process = None
         self.is_running = False
 
-def setup_ollama_for_friday():
+def wait_for_shutdown():
+    """Block the main thread without waking up until a signal handler exits the process"""
+    if hasattr(signal, "pause"):
+        while True:
+            signal.pause()
+    threading.Event().wait()
+
+async def pull_models(service: FridayOllamaService, models: List[str], parallel_pulls: int) -> List[bool]:
+    """Download models concurrently, with at most parallel_pulls in flight"""
+    semaphore = asyncio.Semaphore(max(1, parallel_pulls))
+    
+    async def pull(model: str) -> bool:
+        async with semaphore:
+            print(f"📥 Downloading {model}...", flush=True)
+            ready = await asyncio.to_thread(service.ensure_model_available, model)
+            if ready:
+                print(f"✅ {model} ready", flush=True)
+            else:
+                print(f"⚠️ Failed to download {model}", flush=True)
+            return ready
+    
+    return await asyncio.gather(*(pull(model) for model in models))
+
+def setup_ollama_for_friday(parallel_pulls: int = 2):
     """Setup Ollama for Friday on first run"""
     service = FridayOllamaService()
     
@@ -200,13 +313,7 @@ def setup_ollama_for_friday():
     
     # Download recommended models
     models = ["mistral:7b", "qwen2.5:1.5b"]  # Start with essential models
-    
-    for model in models:
-        print(f"📥 Downloading {model}...")
-        if service.ensure_model_available(model):
-            print(f"✅ {model} ready")
-        else:
-            print(f"⚠️ Failed to download {model}")
+    asyncio.run(pull_models(service, models, parallel_pulls))
     
     return True
 
@@ -214,11 +321,15 @@ def main():
     parser = argparse.ArgumentParser(description="Friday Ollama Service")
     parser.add_argument("--setup", action="store_true", help="Setup Ollama for Friday")
     parser.add_argument("--test", action="store_true", help="Test Ollama installation")
+    parser.add_argument("--parallel-pulls", type=int, default=2,
+                        help="Maximum number of models downloaded at once during --setup (default: 2)")
+    parser.add_argument("--keep-alive", default="30m",
+                        help="How long Ollama keeps the model loaded between requests, e.g. 30m, or a negative duration such as -1m to never unload (default: 30m)")
     
     args = parser.parse_args()
     
     if args.setup:
-        success = setup_ollama_for_friday()
+        success = setup_ollama_for_friday(args.parallel_pulls)
         sys.exit(0 if success else 1)
     
     if args.test:
@@ -227,6 +338,11 @@ def main():
             print("✅ Ollama is installed")
             if service.start_ollama():
                 print("✅ Ollama is running")
+                # Only a quick check: pulling a missing model is left to --setup
+                if not service.has_model(service.default_model):
+                    print(f"⚠️ {service.default_model} is not downloaded yet; run --setup to pull it")
+                elif service.warm_up():
+                    print(f"✅ {service.default_model} is loaded")
                 sys.exit(0)
             else:
                 print("❌ Ollama failed to start")
@@ -236,7 +352,7 @@ def main():
             sys.exit(1)
     
     # Default: keep service running
-    service = FridayOllamaService()
+    service = FridayOllamaService(keep_alive=args.keep_alive)
     
     def signal_handler(sig, frame):
         print("Shutting down...")
@@ -246,9 +362,13 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
+    # Make the default model resident before the first request, if it's already
+    # downloaded; a missing model is pulled by the first request that needs it
+    if service.start_ollama() and service.has_model(service.default_model):
+        service.warm_up()
+    
     try:
-        while True:
-            time.sleep(1)
+        wait_for_shutdown()
     except KeyboardInterrupt:
         service.cleanup()
 
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Physical CPU core count for sizing CTranslate2 thread pools
+"""
+
+import os
+import subprocess
+import sys
+
+def physical_cpu_count() -> int:
+    """Number of physical CPU cores, falling back to the logical count.
+    
+    Logical counts can't simply be halved: Apple Silicon has no SMT, while most
+    x86 CPUs run two hardware threads per core.
+    """
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+        if count:
+            return count
+    except ImportError:
+        pass
+    if sys.platform == "darwin":
+        try:
+            result = subprocess.run(["sysctl", "-n", "hw.physicalcpu"],
+                                    capture_output=True, text=True, check=True)
+            return max(1, int(result.stdout))
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            pass
+    return os.cpu_count() or 1
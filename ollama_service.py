@@ -4,14 +4,21 @@ Ollama Service Backend for Friday
 Provides a Python interface to Ollama models for AI features
 """
 
+import asyncio
+import os
+import re
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import orjson
 import subprocess
 import time
 import socket
 import logging
 import argparse
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterator, List, Optional, Any
+from urllib.parse import urlparse
+import threading
 from threading import Thread
 import signal
 import sys
@@ -19,18 +26,87 @@ import sys
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long the list of locally available models is trusted before re-syncing
+MODEL_CACHE_TTL = 60
+
+# Seconds to wait for a spawned server to answer, and for a model to load into memory
+SERVER_READY_TIMEOUT = 30
+MODEL_READY_TIMEOUT = 120
+
+# Token budget per generation; request timeouts scale with it (see _request_timeout)
+NUM_PREDICT = 2048
+# Used until a generation speed has been measured, and as the floor after that
+DEFAULT_REQUEST_TIMEOUT = 120
+# Weight of the newest sample in the tokens/s and prompt/load time moving averages
+TOKEN_RATE_EMA_ALPHA = 0.3
+
+# Server-side concurrency defaults for a spawned `ollama serve`; values already
+# set in the environment take precedence. OLLAMA_NUM_PARALLEL is the number of
+# requests a loaded model serves at once, which is what lets the concurrent
+# meeting-analysis prompts below actually overlap on the server.
+OLLAMA_SERVE_ENV_DEFAULTS = {
+    "OLLAMA_NUM_PARALLEL": "4",
+    "OLLAMA_MAX_LOADED_MODELS": "2",
+    "OLLAMA_KEEP_ALIVE": "30m",
+}
+
+# First "{" through last "}" of an LLM response
+JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+
+def parse_json_object(content: str) -> Dict[str, Any]:
+    """Extract and parse the outermost JSON object in an LLM response"""
+    match = JSON_OBJECT_RE.search(content)
+    if not match:
+        raise ValueError("No JSON found in response")
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return orjson.loads(match.group(0))
+
+def parse_json_response(content: str) -> Dict[str, Any]:
+    """Parse a JSON-mode response, falling back to extracting the object from surrounding text"""
+    try:
+        result = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return parse_json_object(content)
+    # Valid JSON that isn't an object (a list, string or number) may still contain one
+    if not isinstance(result, dict):
+        return parse_json_object(content)
+    return result
+
 class OllamaServiceBackend:
-    def __init__(self, api_url: str = "http://localhost:11434", default_model: str = "mistral:7b"):
+    def __init__(self, api_url: str = "http://localhost:11434", default_model: str = "mistral:7b",
+                 keep_alive: str = "30m"):
         self.api_url = api_url
         self.default_model = default_model
+        # How long Ollama keeps the model loaded after each request
+        self.keep_alive = keep_alive
         self.ollama_process = None
         self.is_running = False
+        # Keep-alive session shared by every request to the Ollama API; the pool holds
+        # enough connections for concurrent requests to each reuse their own
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        # Local model names from /api/tags, refreshed every MODEL_CACHE_TTL seconds
+        self._available_models = set()
+        self._models_fetched_at = 0.0
+        # Models that have answered a one-token generation (see warm_up)
+        self._ready_models = set()
+        self._ready_lock = threading.Lock()
+        # Exponential moving averages of generation speed, and of the seconds a request
+        # spends loading the model and evaluating its prompt, as reported by Ollama
+        self._tok_per_s_ema = None
+        self._overhead_s_ema = None
+        # Generations sent and not yet answered; a server already running with fewer
+        # parallel slots queues them, so each one's timeout covers those ahead of it
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        # Last rendered transcript, so summary/Q&A/analysis on one meeting format it once
+        self._rendered_transcript = (None, "")  # (content key, text), replaced as one
         
     def start_ollama(self) -> bool:
-        """Start Ollama service if not already running"""
+        """Start Ollama service if not already running (see OLLAMA_SERVE_ENV_DEFAULTS)"""
         try:
             # Check if Ollama is already running
-            response = requests.get(f"{self.api_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.api_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 logger.info("Ollama is already running")
                 self.is_running = True
@@ -42,21 +118,19 @@ class OllamaServiceBackend:
             # Start Ollama serve
             self.ollama_process = subprocess.Popen(
                 ["ollama", "serve"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                # Ollama logs heavily; unread pipes would fill up and block the server
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                # Own session so terminal signals aren't delivered twice; cleanup() stops it
+                start_new_session=True,
+                close_fds=True,
+                env={**OLLAMA_SERVE_ENV_DEFAULTS, **os.environ}
             )
             
-            # Wait for Ollama to start
-            for _ in range(30):  # Wait up to 30 seconds
-                try:
-                    response = requests.get(f"{self.api_url}/api/tags", timeout=2)
-                    if response.status_code == 200:
-                        logger.info("Ollama started successfully")
-                        self.is_running = True
-                        return True
-                except requests.RequestException:
-                    time.sleep(1)
+            if asyncio.run(self.await_ready(timeout=SERVER_READY_TIMEOUT)):
+                logger.info("Ollama started successfully")
+                self.is_running = True
+                return True
                     
             logger.error("Failed to start Ollama service")
             return False
@@ -65,36 +139,166 @@ class OllamaServiceBackend:
             logger.error(f"Error starting Ollama: {e}")
             return False
     
+    def _probe_tcp(self, timeout: float) -> bool:
+        """Readiness tier 1: the API port accepts connections"""
+        url = urlparse(self.api_url)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        with socket.create_connection((url.hostname, port), timeout=min(timeout, 2)):
+            return True
+    
+    def _probe_tags(self, timeout: float) -> bool:
+        """Readiness tier 2: the HTTP API answers"""
+        response = self._session.get(f"{self.api_url}/api/tags", timeout=min(timeout, 2))
+        return response.status_code == 200
+    
+    def _probe_generate(self, model: str, timeout: float) -> bool:
+        """Readiness tier 3: the model generates one token, which also loads it for keep_alive"""
+        response = self._session.post(
+            f"{self.api_url}/api/generate",
+            json={
+                "model": model,
+                "prompt": " ",
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": {"num_predict": 1}
+            },
+            timeout=timeout
+        )
+        return response.status_code == 200
+    
+    async def await_ready(self, model: Optional[str] = None, timeout: float = SERVER_READY_TIMEOUT) -> bool:
+        """Wait until Ollama can serve requests, checking the TCP port, then /api/tags,
+        then (if a model is given) a one-token generation.
+        
+        Each failed check is retried with backoff from 25 ms to 500 ms, and every attempt
+        is bounded by the time left before the timeout.
+        """
+        checks: List[Callable[[float], bool]] = [self._probe_tcp, self._probe_tags]
+        if model:
+            checks.append(lambda remaining: self._probe_generate(model, remaining))
+        
+        delay = 0.025
+        deadline = time.monotonic() + timeout
+        for check in checks:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    if await asyncio.wait_for(asyncio.to_thread(check, remaining), remaining):
+                        break
+                except (asyncio.TimeoutError, OSError, requests.RequestException):
+                    pass
+                await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+                delay = min(delay * 2, 0.5)
+        return True
+    
+    def _refresh_available_models(self) -> None:
+        """Fetch the names of all local models with a single /api/tags call"""
+        response = self._session.get(f"{self.api_url}/api/tags", timeout=10)
+        if response.status_code == 200:
+            names = set()
+            for entry in response.json().get("models", []):
+                name = entry.get("name", "")
+                names.add(name)
+                # "mistral" and "mistral:latest" refer to the same model
+                if name.endswith(":latest"):
+                    names.add(name[:-len(":latest")])
+            self._available_models = names
+            self._models_fetched_at = time.monotonic()
+    
     def ensure_model_available(self, model: str) -> bool:
         """Ensure the specified model is available, download if necessary"""
         try:
-            # Check if model exists
-            response = requests.post(
-                f"{self.api_url}/api/show",
-                json={"name": model},
-                timeout=10
-            )
+            # Check the cached model list, re-syncing it once it is stale
+            if time.monotonic() - self._models_fetched_at > MODEL_CACHE_TTL:
+                self._refresh_available_models()
             
-            if response.status_code == 200:
+            if model in self._available_models:
                 return True
                 
             logger.info(f"Model {model} not found, downloading...")
             
             # Pull the model
-            response = requests.post(
+            response = self._session.post(
                 f"{self.api_url}/api/pull",
                 json={"name": model},
                 timeout=300  # 5 minutes for download
             )
             
-            return response.status_code == 200
+            if response.status_code == 200:
+                self._available_models.add(model)
+                return True
+            return False
             
         except Exception as e:
             logger.error(f"Error ensuring model {model} is available: {e}")
             return False
     
-    def generate_response(self, prompt: str, model: Optional[str] = None) -> Dict[str, Any]:
-        """Generate a response using Ollama"""
+    def _generate_payload(self, prompt: str, model: str, stream: bool,
+                          json_mode: bool = False) -> Dict[str, Any]:
+        """Request body for /api/generate"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": 0.3,
+                "top_k": 40,
+                "top_p": 0.95,
+                "num_predict": NUM_PREDICT,
+            }
+        }
+        if json_mode:
+            # Constrain the model to emit a single valid JSON value
+            payload["format"] = "json"
+        return payload
+    
+    def _request_timeout(self, num_predict: int = NUM_PREDICT) -> float:
+        """Seconds to allow a generation: twice the expected time of every request in flight.
+        
+        A request's expected time is its model load and prompt evaluation plus num_predict
+        tokens at the measured speed, and in the worst case it waits for all the other
+        requests in flight. Never less than DEFAULT_REQUEST_TIMEOUT. OLLAMA_REQUEST_TIMEOUT
+        in the environment overrides the estimate.
+        """
+        override = os.environ.get("OLLAMA_REQUEST_TIMEOUT")
+        if override:
+            return float(override)
+        if self._tok_per_s_ema is None:
+            return DEFAULT_REQUEST_TIMEOUT
+        expected = num_predict / max(1.0, self._tok_per_s_ema) + (self._overhead_s_ema or 0.0)
+        return max(DEFAULT_REQUEST_TIMEOUT, expected * max(1, self._in_flight) * 2)
+    
+    def _begin_request(self) -> None:
+        """Count a generation as in flight until the matching _end_request"""
+        with self._in_flight_lock:
+            self._in_flight += 1
+    
+    def _end_request(self) -> None:
+        """Count a generation as answered"""
+        with self._in_flight_lock:
+            self._in_flight -= 1
+    
+    def _record_token_rate(self, data: Dict[str, Any]) -> None:
+        """Fold the timings (nanoseconds) from a finished generation into the averages"""
+        eval_count = data.get("eval_count")
+        eval_duration = data.get("eval_duration")
+        if not eval_count or not eval_duration:
+            return
+        rate = eval_count / (eval_duration / 1e9)
+        overhead = (data.get("prompt_eval_duration", 0) + data.get("load_duration", 0)) / 1e9
+        if self._tok_per_s_ema is None:
+            self._tok_per_s_ema = rate
+            self._overhead_s_ema = overhead
+        else:
+            self._tok_per_s_ema += TOKEN_RATE_EMA_ALPHA * (rate - self._tok_per_s_ema)
+            self._overhead_s_ema += TOKEN_RATE_EMA_ALPHA * (overhead - self._overhead_s_ema)
+    
+    def generate_response(self, prompt: str, model: Optional[str] = None,
+                          json_mode: bool = False) -> Dict[str, Any]:
+        """Generate a response using Ollama; json_mode requests strict JSON output"""
         if not self.is_running:
             if not self.start_ollama():
                 return {"success": False, "error": "Failed to start Ollama service"}
@@ -104,25 +308,20 @@ class OllamaServiceBackend:
         if not self.ensure_model_available(model):
             return {"success": False, "error": f"Model {model} is not available"}
         
+        if not self.warm_up(model):
+            return {"success": False, "error": f"Model {model} did not become ready"}
+        
+        self._begin_request()
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.api_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "top_k": 40,
-                        "top_p": 0.95,
-                        "num_predict": 2048,
-                    }
-                },
-                timeout=120
+                json=self._generate_payload(prompt, model, stream=False, json_mode=json_mode),
+                timeout=self._request_timeout()
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
+                self._record_token_rate(data)
                 return {
                     "success": True,
                     "response": data.get("response", ""),
@@ -136,14 +335,80 @@ class OllamaServiceBackend:
                 
         except Exception as e:
             return {"success": False, "error": f"Request error: {str(e)}"}
+        finally:
+            self._end_request()
+    
+    def generate_stream(self, prompt: str, model: Optional[str] = None) -> Iterator[str]:
+        """Generate a response using Ollama, yielding text fragments as they are produced.
+        
+        Raises RuntimeError if the service or model is unavailable or the API returns an error.
+        """
+        if not self.is_running:
+            if not self.start_ollama():
+                raise RuntimeError("Failed to start Ollama service")
+        
+        model = model or self.default_model
+        
+        if not self.ensure_model_available(model):
+            raise RuntimeError(f"Model {model} is not available")
+        
+        if not self.warm_up(model):
+            raise RuntimeError(f"Model {model} did not become ready")
+        
+        self._begin_request()
+        try:
+            with self._session.post(
+                f"{self.api_url}/api/generate",
+                json=self._generate_payload(prompt, model, stream=True),
+                stream=True,
+                timeout=self._request_timeout()
+            ) as response:
+                if response.status_code != 200:
+                    raise RuntimeError(f"Ollama API error: {response.status_code} - {response.text}")
+                
+                # Ollama streams one JSON object per line
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = orjson.loads(line)
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done"):
+                        self._record_token_rate(data)
+                        break
+        finally:
+            self._end_request()
+    
+    async def agenerate_response(self, prompt: str, model: Optional[str] = None,
+                                 json_mode: bool = False) -> Dict[str, Any]:
+        """Async variant of generate_response so several prompts can run concurrently"""
+        return await asyncio.to_thread(self.generate_response, prompt, model, json_mode)
+    
+    def _render_transcript(self, transcript: List[Dict]) -> str:
+        """Format transcript lines for a prompt, reusing the result while the lines are unchanged"""
+        # Keyed on content, so a list edited in place is rendered again
+        key = tuple((line['time'], line['text']) for line in transcript)
+        cached_key, text = self._rendered_transcript
+        if key != cached_key:
+            text = "\n".join([f"[{time}] {line_text}" for time, line_text in key])
+            self._rendered_transcript = (key, text)
+        return text
     
     def generate_meeting_content(self, transcript: List[Dict], global_context: str, 
                                meeting_context: str, notes: str, title: str, 
                                model: Optional[str] = None) -> Dict[str, Any]:
         """Generate meeting content analysis"""
-        transcript_text = "\n".join([f"[{line['time']}] {line['text']}" for line in transcript])
+        return asyncio.run(self.agenerate_meeting_content(
+            transcript, global_context, meeting_context, notes, title, model
+        ))
+    
+    async def agenerate_meeting_content(self, transcript: List[Dict], global_context: str, 
+                                        meeting_context: str, notes: str, title: str, 
+                                        model: Optional[str] = None) -> Dict[str, Any]:
+        """Generate meeting content analysis, requesting each part concurrently"""
+        transcript_text = self._render_transcript(transcript)
         
-        prompt = f"""You are an AI assistant helping to analyze a meeting recording. Please generate a comprehensive analysis based on the following information:
+        meeting_info = f"""You are an AI assistant helping to analyze a meeting recording.
 
 MEETING CONTEXT:
 Title: {title}
@@ -155,58 +420,80 @@ TRANSCRIPT:
 
 NOTES:
 {notes}
+"""
+        
+        summary_prompt = f"""{meeting_info}
+Please provide a comprehensive summary of the meeting (3-4 sentences).
+
+Summary:"""
+        
+        description_prompt = f"""{meeting_info}
+Please provide a detailed description covering key topics, decisions, and outcomes.
 
-Please provide your response in the following JSON format (ensure it's valid JSON with escaped quotes):
+Description:"""
+        
+        action_items_prompt = f"""{meeting_info}
+Please list the action items from this meeting in the following JSON format (ensure it's valid JSON with escaped quotes):
 {{
-  "summary": "A comprehensive summary of the meeting (3-4 sentences)",
-  "description": "A detailed description covering key topics, decisions, and outcomes",
   "actionItems": [
     {{
       "id": 1,
       "text": "Action item description",
       "completed": false
     }}
-  ],
+  ]
+}}
+
+Response:"""
+        
+        tags_prompt = f"""{meeting_info}
+Please provide 3-5 short tags for this meeting in the following JSON format:
+{{
   "tags": ["tag1", "tag2", "tag3"]
 }}
 
 Response:"""
         
-        result = self.generate_response(prompt, model)
-        if not result["success"]:
-            return result
-            
+        # Start the server up front so the concurrent calls don't race to spawn it
+        if not self.is_running and not await asyncio.to_thread(self.start_ollama):
+            return {"success": False, "error": "Failed to start Ollama service"}
+        
+        # The four parts are independent, so latency is the slowest call rather than the sum
+        results = await asyncio.gather(
+            self.agenerate_response(summary_prompt, model),
+            self.agenerate_response(description_prompt, model),
+            self.agenerate_response(action_items_prompt, model, json_mode=True),
+            self.agenerate_response(tags_prompt, model, json_mode=True),
+        )
+        for result in results:
+            if not result["success"]:
+                return result
+        summary_result, description_result, action_items_result, tags_result = results
+        
         try:
-            # Extract JSON from response
-            content = result["response"]
-            json_start = content.find("{")
-            json_end = content.rfind("}")
-            
-            if json_start != -1 and json_end != -1:
-                json_str = content[json_start:json_end+1]
-                parsed_data = json.loads(json_str)
-                
-                return {
-                    "success": True,
-                    "data": {
-                        "summary": parsed_data.get("summary", ""),
-                        "description": parsed_data.get("description", ""),
-                        "actionItems": parsed_data.get("actionItems", []),
-                        "tags": parsed_data.get("tags", [])
-                    }
-                }
-            else:
-                return {"success": False, "error": "No JSON found in response"}
-                
+            action_items = parse_json_response(action_items_result["response"]).get("actionItems", [])
+            tags = parse_json_response(tags_result["response"]).get("tags", [])
         except json.JSONDecodeError as e:
             return {"success": False, "error": f"Failed to parse JSON response: {str(e)}"}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        
+        return {
+            "success": True,
+            "data": {
+                "summary": summary_result["response"].strip(),
+                "description": description_result["response"].strip(),
+                "actionItems": action_items,
+                "tags": tags
+            }
+        }
     
-    def generate_summary(self, transcript: List[Dict], global_context: str, 
-                        meeting_context: str, notes: str, model: Optional[str] = None) -> Dict[str, Any]:
-        """Generate meeting summary only"""
-        transcript_text = "\n".join([f"[{line['time']}] {line['text']}" for line in transcript])
+    def _summary_prompt(self, transcript: List[Dict], global_context: str, 
+                        meeting_context: str, notes: str) -> str:
+        """Build the prompt for a meeting summary"""
+        transcript_text = self._render_transcript(transcript)
         
-        prompt = f"""Please provide a concise summary of this meeting transcript:
+        return f"""Please provide a concise summary of this meeting transcript:
 
 CONTEXT: {global_context}
 MEETING CONTEXT: {meeting_context}
@@ -218,18 +505,28 @@ NOTES:
 {notes}
 
 Please provide a 2-3 sentence summary focusing on key decisions, outcomes, and next steps:"""
+    
+    def generate_summary(self, transcript: List[Dict], global_context: str, 
+                        meeting_context: str, notes: str, model: Optional[str] = None) -> Dict[str, Any]:
+        """Generate meeting summary only"""
+        prompt = self._summary_prompt(transcript, global_context, meeting_context, notes)
         
         result = self.generate_response(prompt, model)
         if result["success"]:
             return {"success": True, "summary": result["response"]}
         return result
     
-    def ask_question(self, question: str, transcript: List[Dict], context: Dict[str, str], 
-                    model: Optional[str] = None) -> Dict[str, Any]:
-        """Answer a question about the meeting"""
-        transcript_text = "\n".join([f"[{line['time']}] {line['text']}" for line in transcript])
+    def stream_summary(self, transcript: List[Dict], global_context: str, 
+                       meeting_context: str, notes: str, model: Optional[str] = None) -> Iterator[str]:
+        """Generate meeting summary, yielding text as it is produced"""
+        prompt = self._summary_prompt(transcript, global_context, meeting_context, notes)
+        return self.generate_stream(prompt, model)
+    
+    def _question_prompt(self, question: str, transcript: List[Dict], context: Dict[str, str]) -> str:
+        """Build the prompt for a question about the meeting"""
+        transcript_text = self._render_transcript(transcript)
         
-        prompt = f"""You are an AI assistant with access to a meeting transcript. Please answer the user's question based on the information provided.
+        return f"""You are an AI assistant with access to a meeting transcript. Please answer the user's question based on the information provided.
 
 MEETING INFORMATION:
 Title: {context.get('title', 'Meeting')}
@@ -246,12 +543,35 @@ USER QUESTION: {question}
 Please provide a helpful and accurate answer based on the meeting information. If the information isn't available in the transcript, please say so.
 
 Answer:"""
+    
+    def ask_question(self, question: str, transcript: List[Dict], context: Dict[str, str], 
+                    model: Optional[str] = None) -> Dict[str, Any]:
+        """Answer a question about the meeting"""
+        prompt = self._question_prompt(question, transcript, context)
         
         result = self.generate_response(prompt, model)
         if result["success"]:
             return {"success": True, "answer": result["response"]}
         return result
     
+    def stream_answer(self, question: str, transcript: List[Dict], context: Dict[str, str], 
+                      model: Optional[str] = None) -> Iterator[str]:
+        """Answer a question about the meeting, yielding text as it is produced"""
+        prompt = self._question_prompt(question, transcript, context)
+        return self.generate_stream(prompt, model)
+    
+    def warm_up(self, model: Optional[str] = None) -> bool:
+        """Wait until the model is loaded and answering, once per model, so the first real request is fast"""
+        model = model or self.default_model
+        # Concurrent first requests wait for one probe instead of each sending their own
+        with self._ready_lock:
+            if model not in self._ready_models:
+                if not asyncio.run(self.await_ready(model, timeout=MODEL_READY_TIMEOUT)):
+                    logger.warning(f"Model {model} did not become ready within {MODEL_READY_TIMEOUT}s")
+                    return False
+                self._ready_models.add(model)
+        return True
+    
     def cleanup(self):
         """Clean up the Ollama process"""
         if self.ollama_process and self.ollama_process.poll() is None:
@@ -263,6 +583,14 @@ Answer:"""
                 self.ollama_process.kill()
             self.ollama_process = None
         self.is_running = False
+        self._ready_models.clear()
+
+def wait_for_shutdown():
+    """Block the main thread without waking up until a signal handler exits the process"""
+    if hasattr(signal, "pause"):
+        while True:
+            signal.pause()
+    threading.Event().wait()
 
 def signal_handler(sig, frame):
     """Handle shutdown signals"""
@@ -276,6 +604,8 @@ def main():
     parser.add_argument("--api-url", default="http://localhost:11434", help="Ollama API URL")
     parser.add_argument("--model", default="mistral:7b", help="Default model to use")
     parser.add_argument("--port", type=int, default=9002, help="Port to run service on")
+    parser.add_argument("--keep-alive", default="30m",
+                        help="How long Ollama keeps the model loaded between requests, e.g. 30m, or a negative duration such as -1m to never unload (default: 30m)")
     
     args = parser.parse_args()
     
@@ -284,7 +614,7 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     # Create service
-    service = OllamaServiceBackend(args.api_url, args.model)
+    service = OllamaServiceBackend(args.api_url, args.model, args.keep_alive)
     signal_handler.service = service
     
     # Start Ollama
@@ -292,13 +622,16 @@ def main():
         logger.error("Failed to start Ollama service")
         sys.exit(1)
     
+    # Make the default model resident before the first user request
+    if service.ensure_model_available(args.model):
+        service.warm_up(args.model)
+    
     logger.info(f"Ollama service backend started on port {args.port}")
     logger.info(f"Using model: {args.model}")
     
     # Keep the service running
     try:
-        while True:
-            time.sleep(1)
+        wait_for_shutdown()
     except KeyboardInterrupt:
         logger.info("Shutting down...")
         service.cleanup()
@@ -1958,7 +1958,7 @@ function setupTranscriptionHandlers(): void {
           keywords: options.keywords
         })
 
-        transcriptionSocket!.write(alertRequest)
+        transcriptionSocket!.write(alertRequest + '\n')
 
         // Timeout after 10 seconds
         setTimeout(() => {
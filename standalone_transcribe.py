@@ -8,53 +8,147 @@ import sys
 import os
 import json
 import argparse
+import io
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import ctranslate2
 from faster_whisper import WhisperModel
 
-def transcribe_audio_file(audio_path, output_format='text', model_size='small'):
+try:
+    from faster_whisper import BatchedInferencePipeline  # faster-whisper >= 1.1
+except ImportError:
+    BatchedInferencePipeline = None
+
+# Loaded models, keyed by (model_size, device, compute_type)
+_MODEL_CACHE = {}
+# Batched pipelines wrapping cached models, keyed like _MODEL_CACHE
+_PIPELINE_CACHE = {}
+
+# Segments decoded per encoder batch when several files are transcribed
+DEFAULT_BATCH_SIZE = 8
+OUTPUT_EXTENSIONS = {'text': '.txt', 'json': '.json', 'srt': '.srt'}
+# Multilingual Whisper sizes, plus English-only distilled models with about half
+# the decoder cost of the matching size
+MODEL_CHOICES = ['tiny', 'base', 'small', 'medium', 'large',
+                 'distil-small.en', 'distil-medium.en', 'distil-large-v3']
+
+# Greedy output whose mean segment log-probability falls below this is re-decoded
+# with beam search (same value as faster-whisper's log_prob_threshold)
+LOW_CONFIDENCE_LOGPROB = -1.0
+FALLBACK_BEAM_SIZE = 5
+
+# --vad fast: merge across longer pauses with a more permissive threshold, so Whisper
+# gets fewer, longer speech chunks to decode
+FAST_VAD_PARAMETERS = dict(min_silence_duration_ms=1000, speech_pad_ms=200, threshold=0.35)
+
+def resolve_device(device='auto'):
+    """Pick CUDA when 'auto' and a GPU is visible to CTranslate2, else CPU"""
+    if device == 'auto':
+        return 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+    return device
+
+def default_compute_type(device):
+    """int8 weights everywhere; on GPU the activations run in float16 on tensor cores"""
+    return 'int8_float16' if device == 'cuda' else 'int8'
+
+def get_model(model_size='small', device='auto', compute_type=None):
+    """Return a loaded WhisperModel, loading it only on first use"""
+    device = resolve_device(device)
+    compute_type = compute_type or default_compute_type(device)
+    key = (model_size, device, compute_type)
+    model = _MODEL_CACHE.get(key)
+    if model is None:
+        print(f"🎤 Loading Whisper model ({model_size}, {device}, {compute_type})...")
+        try:
+            model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        except (RuntimeError, ValueError) as e:
+            if device == 'cpu':
+                raise
+            # GPU present but unusable (driver, cuDNN, unsupported type): fall back to CPU,
+            # cached under the GPU key too so later files don't retry the failing load
+            print(f"⚠️ Could not load model on {device} ({e}), falling back to CPU")
+            model = get_model(model_size, 'cpu', None)
+        _MODEL_CACHE[key] = model
+    return model
+
+def get_pipeline(model_size='small', device='auto', compute_type=None):
+    """Return a BatchedInferencePipeline around the cached model, or the model itself if unsupported"""
+    model = get_model(model_size, device, compute_type)
+    if BatchedInferencePipeline is None:
+        return model
+    key = id(model)
+    pipeline = _PIPELINE_CACHE.get(key)
+    if pipeline is None:
+        pipeline = BatchedInferencePipeline(model=model)
+        _PIPELINE_CACHE[key] = pipeline
+    return pipeline
+
+def vad_options(vad='on', vad_min_silence_ms=500):
+    """transcribe() keyword arguments for a --vad mode ('on', 'off' or 'fast')"""
+    if vad == 'off':
+        return dict(vad_filter=False)
+    if vad == 'fast':
+        return dict(vad_filter=True, vad_parameters=FAST_VAD_PARAMETERS)
+    return dict(vad_filter=True, vad_parameters=dict(min_silence_duration_ms=vad_min_silence_ms))
+
+def transcribe_audio_file(audio_path, output_format='text', model_size='small',
+                          device='auto', compute_type=None, beam_size=1,
+                          vad_min_silence_ms=500, batch_size=None, vad='on'):
     """
     Transcribe an audio file to text
     
     Args:
         audio_path: Path to the audio file
         output_format: 'text', 'json', or 'srt'
-        model_size: Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
+        model_size: Whisper model size ('tiny', 'base', 'small', 'medium', 'large') or an
+            English-only distilled model ('distil-small.en', 'distil-medium.en', 'distil-large-v3')
+        device: 'auto', 'cpu' or 'cuda'
+        compute_type: CTranslate2 compute type (default: int8 on CPU, int8_float16 on CUDA)
+        beam_size: Decoder beam width; 1 (greedy) is re-run with beam search if confidence is low
+        vad_min_silence_ms: Minimum silence the VAD needs to split speech
+        batch_size: If set, decode VAD segments in batches with BatchedInferencePipeline
+        vad: 'on', 'off' (audio is already speech-only) or 'fast' (see FAST_VAD_PARAMETERS)
     """
     
     if not os.path.exists(audio_path):
         print(f"❌ Audio file not found: {audio_path}")
         return None
     
-    print(f"🎤 Loading Whisper model ({model_size})...")
-    model = WhisperModel(model_size, device="cpu", compute_type="int8")
+    # The batched pipeline splits long audio at VAD boundaries, so it needs the VAD
+    if batch_size and vad != 'off':
+        model = get_pipeline(model_size, device, compute_type)
+    else:
+        model = get_model(model_size, device, compute_type)
     
     print(f"🔄 Transcribing: {audio_path}")
     
-    # Transcribe with same settings as main app
-    segments, info = model.transcribe(
-        audio_path,
-        beam_size=5,  # Higher quality for batch processing
-        language="en",
-        condition_on_previous_text=True,
-        temperature=0.0,
-        vad_filter=True,
-        vad_parameters=dict(min_silence_duration_ms=500)
-    )
+    vad_kwargs = vad_options(vad, vad_min_silence_ms)
+    segments, info = run_transcribe(model, audio_path, beam_size, vad_kwargs, batch_size)
+    
+    # Greedy decoding is much cheaper; only pay for beam search when it looks unreliable
+    if beam_size == 1 and segments:
+        mean_logprob = sum(segment.avg_logprob for segment in segments) / len(segments)
+        if mean_logprob < LOW_CONFIDENCE_LOGPROB:
+            print(f"🔁 Low confidence ({mean_logprob:.2f}), retrying with beam size {FALLBACK_BEAM_SIZE}")
+            segments, info = run_transcribe(model, audio_path, FALLBACK_BEAM_SIZE, vad_kwargs, batch_size)
     
     print(f"📊 Detected language: {info.language} (probability: {info.language_probability:.2f})")
     print(f"⏱️ Duration: {info.duration:.2f} seconds")
     
     # Collect segments
     transcript_segments = []
-    full_text = ""
+    text_parts = []
     
     for segment in segments:
+        text = segment.text.strip()
         transcript_segments.append({
             "start": segment.start,
             "end": segment.end,
-            "text": segment.text.strip()
+            "text": text
         })
-        full_text += segment.text + " "
+        text_parts.append(text)
+    
+    full_text = " ".join(text_parts)
     
     result = {
         "file": audio_path,
@@ -62,77 +156,140 @@ def transcribe_audio_file(audio_path, output_format='text', model_size='small'):
         "language_probability": info.language_probability,
         "duration": info.duration,
         "segments": transcript_segments,
-        "full_text": full_text.strip()
+        "full_text": full_text
     }
     
     return result
 
+def run_transcribe(model, audio_path, beam_size, vad_kwargs, batch_size=None):
+    """Run the model (or batched pipeline) over a file and return (list of segments, info)
+    
+    vad_kwargs holds the vad_filter/vad_parameters arguments from vad_options().
+    """
+    options = dict(
+        beam_size=beam_size,
+        language="en",
+        temperature=0.0,
+        word_timestamps=False,
+        **vad_kwargs
+    )
+    if BatchedInferencePipeline is not None and isinstance(model, BatchedInferencePipeline):
+        # Batched segments are decoded independently, so there is no previous text to condition on
+        segments, info = model.transcribe(audio_path, batch_size=batch_size, **options)
+    else:
+        segments, info = model.transcribe(audio_path, condition_on_previous_text=True, **options)
+    return list(segments), info
+
 def format_output(result, output_format):
     """Format the transcription result"""
     
     if output_format == 'json':
         return json.dumps(result, indent=2)
     
-    elif output_format == 'srt':
-        srt_content = ""
+    buf = io.StringIO()
+    write = buf.write
+    
+    if output_format == 'srt':
+        fmt = format_timestamp
         for i, segment in enumerate(result['segments'], 1):
-            start_time = format_timestamp(segment['start'])
-            end_time = format_timestamp(segment['end'])
-            srt_content += f"{i}\n{start_time} --> {end_time}\n{segment['text']}\n\n"
-        return srt_content
+            write(f"{i}\n{fmt(segment['start'])} --> {fmt(segment['end'])}\n{segment['text']}\n\n")
     
     else:  # text format
-        output = f"File: {result['file']}\n"
-        output += f"Language: {result['language']} ({result['language_probability']:.2f})\n"
-        output += f"Duration: {result['duration']:.2f}s\n"
-        output += f"\nTranscript:\n{'-' * 50}\n"
-        output += result['full_text']
-        output += f"\n{'-' * 50}\n"
+        write(f"File: {result['file']}\n"
+              f"Language: {result['language']} ({result['language_probability']:.2f})\n"
+              f"Duration: {result['duration']:.2f}s\n"
+              f"\nTranscript:\n{'-' * 50}\n")
+        write(result['full_text'])
+        write(f"\n{'-' * 50}\n")
         
         if len(result['segments']) > 1:
-            output += "\nTimestamped Segments:\n"
+            write("\nTimestamped Segments:\n")
             for segment in result['segments']:
-                start_min = int(segment['start'] // 60)
-                start_sec = int(segment['start'] % 60)
-                output += f"[{start_min:02d}:{start_sec:02d}] {segment['text']}\n"
-        
-        return output
+                start_min, start_sec = divmod(int(segment['start']), 60)
+                write(f"[{start_min:02d}:{start_sec:02d}] {segment['text']}\n")
+    
+    return buf.getvalue()
 
 def format_timestamp(seconds):
     """Convert seconds to SRT timestamp format"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
+    secs, millis = divmod(int(seconds * 1000), 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
+def write_output(formatted_output, output_path):
+    """Write a formatted transcript to a file"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(formatted_output)
+    print(f"✅ Transcript saved to: {output_path}")
+
 def main():
     parser = argparse.ArgumentParser(description="Transcribe audio files using Friday's Whisper model")
-    parser.add_argument("audio_file", help="Path to the audio file to transcribe")
-    parser.add_argument("-o", "--output", help="Output file path (default: stdout)")
+    parser.add_argument("audio_file", nargs='+', help="Path to the audio file(s) to transcribe")
+    parser.add_argument("-o", "--output",
+                       help="Output file path, or output directory when several files are given (default: stdout)")
     parser.add_argument("-f", "--format", choices=['text', 'json', 'srt'], default='text',
                        help="Output format (default: text)")
-    parser.add_argument("-m", "--model", choices=['tiny', 'base', 'small', 'medium', 'large'], 
+    parser.add_argument("-m", "--model", choices=MODEL_CHOICES, 
                        default='small', help="Whisper model size (default: small)")
+    parser.add_argument("--device", choices=['auto', 'cpu', 'cuda'], default='auto',
+                       help="Inference device; auto uses CUDA when available (default: auto)")
+    parser.add_argument("--compute-type", choices=['int8', 'int8_float16', 'int8_float32', 'float16', 'float32'],
+                       help="CTranslate2 compute type (default: int8 on CPU, int8_float16 on CUDA)")
+    parser.add_argument("--beam-size", type=int, default=1,
+                       help="Decoder beam size; 1 is greedy with a beam-search retry on low confidence (default: 1)")
+    parser.add_argument("--hq", action='store_true',
+                       help="High quality: always decode with beam size 5")
+    parser.add_argument("--vad-min-silence-ms", type=int, default=500,
+                       help="Minimum silence in ms for the VAD to split speech (default: 500)")
+    parser.add_argument("--vad", choices=['on', 'off', 'fast'], default='on',
+                       help="Voice activity detection: on, off, or fast (fewer, longer chunks) (default: on)")
+    parser.add_argument("--no-vad", dest='vad', action='store_const', const='off',
+                       help="Same as --vad off, for audio that has already been VAD-filtered")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                       help=f"Segments per batch when transcribing several files (default: {DEFAULT_BATCH_SIZE})")
     
     args = parser.parse_args()
+    beam_size = FALLBACK_BEAM_SIZE if args.hq else args.beam_size
+    multiple = len(args.audio_file) > 1
     
-    # Transcribe the audio file
-    result = transcribe_audio_file(args.audio_file, args.format, args.model)
+    if multiple and args.output:
+        Path(args.output).mkdir(parents=True, exist_ok=True)
     
-    if result is None:
-        sys.exit(1)
+    failed = False
+    writes = []
+    # File writes run on a background thread so the next file's decode isn't held up by I/O
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        for audio_file in args.audio_file:
+            # Transcribe the audio file
+            result = transcribe_audio_file(audio_file, args.format, args.model,
+                                           args.device, args.compute_type, beam_size,
+                                           args.vad_min_silence_ms,
+                                           args.batch_size if multiple else None,
+                                           args.vad)
+            
+            if result is None:
+                failed = True
+                continue
+            
+            # Format the output
+            formatted_output = format_output(result, args.format)
+            
+            # Write to file or stdout
+            if args.output:
+                output_path = args.output
+                if multiple:
+                    output_path = Path(args.output) / (Path(audio_file).stem + OUTPUT_EXTENSIONS[args.format])
+                writes.append(writer.submit(write_output, formatted_output, output_path))
+            else:
+                print("\n" + formatted_output)
     
-    # Format the output
-    formatted_output = format_output(result, args.format)
+    # Surface any write errors
+    for write in writes:
+        write.result()
     
-    # Write to file or stdout
-    if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
-            f.write(formatted_output)
-        print(f"✅ Transcript saved to: {args.output}")
-    else:
-        print("\n" + formatted_output)
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -5,29 +5,106 @@ Demonstrates how to use the new chunking and streaming capabilities.
 """
 
 import socket
-import json
-import time
-import base64
+import queue
+import struct
+import msgpack
 import numpy as np
 import threading
 import wave
 import io
+from collections import deque
+from functools import lru_cache
+
+# Requests and responses are MessagePack bodies behind a 4-byte big-endian length
+FRAME_HEADER = struct.Struct('>I')
+# MessagePack bin32 marker and length, written ahead of raw audio payloads
+BIN32_HEADER = struct.Struct('>BI')
+SOCKET_BUFFER_BYTES = 256 * 1024
+# Requests buffered ahead of the socket, and the most coalesced into one send
+SEND_QUEUE_SIZE = 8
+SEND_BATCH_SIZE = 8
+
+# Noise source for generated test audio
+_rng = np.random.default_rng()
+
+def pack_request(request: dict):
+    """MessagePack-encode a request as (head, payload) for framing.
+    
+    A request's audio_data is left out of the head: the head ends with the map key
+    and a bin32 header, and the raw audio follows as the payload, so the audio is
+    copied once into the send buffer instead of first into a packed body.
+    """
+    packer = msgpack.Packer(use_bin_type=True)
+    audio = request.get('audio_data')
+    if audio is None:
+        return packer.pack(request), b''
+    head = bytearray(packer.pack_map_header(len(request)))
+    for key, value in request.items():
+        if key != 'audio_data':
+            head += packer.pack(key)
+            head += packer.pack(value)
+    head += packer.pack('audio_data')
+    head += BIN32_HEADER.pack(0xc6, len(audio))
+    return head, audio
+
+def pack_chunk_prefix(stream_id: str) -> bytes:
+    """Packed stream_chunk head for a stream, up to the audio_data bin32 header.
+    
+    Only the audio varies between a stream's chunks, so this is built once per stream
+    and each chunk frame is just prefix + bin32 header + audio.
+    """
+    packer = msgpack.Packer(use_bin_type=True)
+    return b''.join((
+        packer.pack_map_header(4),
+        packer.pack('type'), packer.pack('stream_chunk'),
+        packer.pack('stream_id'), packer.pack(stream_id),
+        packer.pack('dtype'), packer.pack('s16le'),
+        packer.pack('audio_data'),
+    ))
 
 class StreamingTranscriptionClient:
-    """Client for testing streaming transcription capabilities"""
+    """Client for testing streaming transcription capabilities.
+    
+    Requests are queued to a writer thread and responses are handled by a reader
+    thread, so audio chunks are pipelined instead of waiting a round-trip each.
+    """
     
     def __init__(self, host='localhost', port=9001):
         self.host = host
         self.port = port
         self.socket = None
         self.connected = False
+        # Reused for every outgoing batch of frames; grown if a batch doesn't fit
+        self._send_buf = bytearray(65536)
+        # Length prefix of the response being read (reader thread only)
+        self._header_buf = bytearray(FRAME_HEADER.size)
+        # Requests waiting for the writer; the bound throttles producers
+        self._tx_q = queue.Queue(maxsize=SEND_QUEUE_SIZE)
+        # Response callbacks in request order (the server answers each request in turn)
+        self._pending = deque()
+        self._pending_lock = threading.Lock()
+        self._writer = None
+        self._reader = None
+        # Called with unsolicited updates such as live_text
+        self.on_update = None
+        # Packed stream_chunk heads by stream_id, built in start_stream
+        self._chunk_prefixes = {}
         
     def connect(self):
         """Connect to the transcription server"""
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Room for whole audio chunks; set before connect so the TCP window can use it
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_BYTES)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_BYTES)
             self.socket.connect((self.host, self.port))
+            # Small request/response round-trips: don't let Nagle hold requests back
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.connected = True
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._reader = threading.Thread(target=self._reader_loop, daemon=True)
+            self._writer.start()
+            self._reader.start()
             print(f"✅ Connected to transcription server at {self.host}:{self.port}")
             return True
         except Exception as e:
@@ -35,12 +112,128 @@ class StreamingTranscriptionClient:
             return False
     
     def disconnect(self):
-        """Disconnect from the server"""
+        """Disconnect from the server once queued requests have been sent"""
         if self.socket:
+            if self._writer:
+                self._tx_q.put(None)
+                self._writer.join()
+            try:
+                # The server closes its side once it has read everything we sent
+                self.socket.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+            if self._reader:
+                self._reader.join(timeout=5)
             self.socket.close()
             self.connected = False
             print("🔌 Disconnected from server")
     
+    def _encode_frames(self, requests: list) -> memoryview:
+        """Pack length-prefixed MessagePack requests back to back into the send buffer.
+        
+        Each request is either a dict or a tuple of already packed body parts.
+        """
+        frames = [request if isinstance(request, tuple) else pack_request(request) for request in requests]
+        lengths = [sum(map(len, parts)) for parts in frames]
+        size = FRAME_HEADER.size * len(frames) + sum(lengths)
+        if size > len(self._send_buf):
+            self._send_buf = bytearray(size)
+        offset = 0
+        for parts, length in zip(frames, lengths):
+            FRAME_HEADER.pack_into(self._send_buf, offset, length)
+            offset += FRAME_HEADER.size
+            for part in parts:
+                self._send_buf[offset:offset + len(part)] = part
+                offset += len(part)
+        return memoryview(self._send_buf)[:size]
+    
+    def _writer_loop(self):
+        """Send queued requests, coalescing whatever is already queued into one sendall"""
+        while True:
+            request = self._tx_q.get()
+            if request is None:
+                return
+            batch = [request]
+            stop = False
+            while len(batch) < SEND_BATCH_SIZE:
+                try:
+                    request = self._tx_q.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            try:
+                self.socket.sendall(self._encode_frames(batch))
+            except OSError as e:
+                print(f"❌ Error sending requests: {e}")
+                return
+            if stop:
+                return
+    
+    def _recv_into(self, buf) -> None:
+        """Fill buf completely from the socket, however the bytes are segmented"""
+        view = memoryview(buf)
+        received = 0
+        while received < len(buf):
+            n = self.socket.recv_into(view[received:])
+            if not n:
+                raise ConnectionError("Server closed the connection")
+            received += n
+    
+    def _recv_response(self) -> dict:
+        """Read one length-prefixed MessagePack response"""
+        self._recv_into(self._header_buf)
+        length, = FRAME_HEADER.unpack(self._header_buf)
+        # Sized up front and filled in place rather than grown chunk by chunk
+        body = bytearray(length)
+        self._recv_into(body)
+        return msgpack.unpackb(body, raw=False)
+    
+    def _reader_loop(self):
+        """Hand each response to the callback of the request it answers"""
+        try:
+            while True:
+                result = self._recv_response()
+                if result.get('type') == 'live_text':
+                    if self.on_update:
+                        self.on_update(result)
+                    continue
+                with self._pending_lock:
+                    callback = self._pending.popleft() if self._pending else None
+                if callback:
+                    callback(result)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            # Fail anything still waiting so callers don't hang
+            with self._pending_lock:
+                pending, self._pending = self._pending, deque()
+            for callback in pending:
+                callback({"success": False, "error": "Connection closed"})
+    
+    def _submit(self, request: dict, callback):
+        """Queue a request; callback(result) runs on the reader thread when it is answered"""
+        # The lock keeps callbacks in the same order as requests in the queue
+        with self._pending_lock:
+            self._pending.append(callback)
+            self._tx_q.put(request)
+    
+    def _request(self, request: dict, timeout: float = 30.0) -> dict:
+        """Send a request and wait for its response"""
+        done = threading.Event()
+        response = {}
+        
+        def callback(result):
+            response.update(result)
+            done.set()
+        
+        self._submit(request, callback)
+        if not done.wait(timeout):
+            raise TimeoutError(f"No response to {request['type']} within {timeout}s")
+        return response
+    
     def start_stream(self, stream_id: str, stream_type: str = 'microphone'):
         """Start a new audio stream"""
         if not self.connected:
@@ -53,11 +246,10 @@ class StreamingTranscriptionClient:
         }
         
         try:
-            self.socket.send(json.dumps(request).encode() + b'\n')
-            response = self.socket.recv(4096).decode().strip()
-            result = json.loads(response)
+            result = self._request(request)
             
             if result.get('success'):
+                self._chunk_prefixes[stream_id] = pack_chunk_prefix(stream_id)
                 print(f"🎬 Started stream: {stream_id} ({stream_type})")
                 return True
             else:
@@ -69,7 +261,7 @@ class StreamingTranscriptionClient:
             return False
     
     def stop_stream(self, stream_id: str):
-        """Stop an audio stream"""
+        """Stop an audio stream, after every chunk queued before it has been answered"""
         if not self.connected:
             return False
             
@@ -79,10 +271,9 @@ class StreamingTranscriptionClient:
         }
         
         try:
-            self.socket.send(json.dumps(request).encode() + b'\n')
-            response = self.socket.recv(4096).decode().strip()
-            result = json.loads(response)
+            result = self._request(request)
             
+            self._chunk_prefixes.pop(stream_id, None)
             if result.get('success'):
                 print(f"🛑 Stopped stream: {stream_id}")
                 return True
@@ -95,51 +286,69 @@ class StreamingTranscriptionClient:
             return False
     
     def send_audio_chunk(self, stream_id: str, audio_data: bytes):
-        """Send audio data to a stream"""
+        """Queue audio data for a stream; the server's answer is reported when it arrives"""
         if not self.connected:
             return False
             
-        # Encode audio data as base64
-        audio_b64 = base64.b64encode(audio_data).decode('utf-8')
-        
-        request = {
-            'type': 'stream_chunk',
-            'stream_id': stream_id,
-            'audio_data': audio_b64
-        }
+        # A prebuilt stream_chunk head with the audio as a MessagePack binary field:
+        # no dict or packing per chunk, and no base64 step
+        prefix = self._chunk_prefixes.get(stream_id)
+        if prefix is None:
+            prefix = self._chunk_prefixes[stream_id] = pack_chunk_prefix(stream_id)
+        request = (prefix, BIN32_HEADER.pack(0xc6, len(audio_data)), audio_data)
         
-        try:
-            self.socket.send(json.dumps(request).encode() + b'\n')
-            response = self.socket.recv(4096).decode().strip()
-            result = json.loads(response)
-            
+        def callback(result):
             if result.get('success'):
                 print(f"📤 Sent audio chunk to stream: {stream_id}")
-                return True
             else:
                 print(f"❌ Failed to send audio chunk: {result.get('error')}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Error sending audio chunk: {e}")
-            return False
+        
+        self._submit(request, callback)
+        return True
+
+@lru_cache(maxsize=32)
+def _cached_sine(duration_seconds: float, sample_rate: int, frequency: float, amplitude: float = 1.0) -> np.ndarray:
+    """Sine wave for the given shape, computed in float32 once and shared read-only"""
+    num_samples = int(duration_seconds * sample_rate)
+    phase = np.arange(num_samples, dtype=np.float32)
+    phase *= np.float32(2 * np.pi * frequency / sample_rate)
+    sine = np.sin(phase, out=phase)
+    if amplitude != 1.0:
+        sine *= np.float32(amplitude)
+    sine.flags.writeable = False
+    return sine
 
 def generate_test_audio(duration_seconds: float, sample_rate: int = 16000, frequency: float = 440.0):
-    """Generate test audio (sine wave) for testing"""
+    """Generate test audio (sine wave) for testing, as little-endian PCM16 bytes"""
     num_samples = int(duration_seconds * sample_rate)
-    t = np.linspace(0, duration_seconds, num_samples, False)
     
-    # Generate sine wave
-    audio = np.sin(2 * np.pi * frequency * t).astype(np.float32)
+    # Noise to make it more realistic, drawn straight into the output buffer. The mix
+    # is 0.1*noise + sine, but normalization makes it scale-free, so unit noise plus
+    # a cached 10x sine gives the same signal without a pass to scale the noise
+    audio = np.empty(num_samples, dtype=np.float32)
+    _rng.standard_normal(dtype=np.float32, out=audio)
+    audio += _cached_sine(duration_seconds, sample_rate, frequency, 10.0)
     
-    # Add some noise to make it more realistic
-    noise = np.random.normal(0, 0.1, audio.shape).astype(np.float32)
-    audio = audio + noise
+    # Peak from max/min reductions, avoiding an np.abs temporary
+    peak = max(audio.max(), -audio.min())
     
-    # Normalize
-    audio = audio / np.max(np.abs(audio))
+    # Normalize and scale to PCM16 range in place, then quantize
+    audio *= np.float32(32767.0 / peak)
+    np.rint(audio, out=audio)
     
-    return audio.tobytes()
+    return audio.astype('<i2').tobytes()
+
+def send_test_chunks(client, stream_id: str, label: str, count: int, duration: float, base_freq: float, freq_step: float):
+    """Queue count generated audio chunks on a stream"""
+    for i in range(count):
+        audio_data = generate_test_audio(duration, frequency=base_freq + i*freq_step)
+        
+        # Queued without waiting; the bounded send queue provides back-pressure
+        if client.send_audio_chunk(stream_id, audio_data):
+            print(f"   {label} chunk {i+1}/{count} queued")
+        else:
+            print(f"   Failed to send {label.lower()} chunk {i+1}")
+            break
 
 def test_streaming_transcription():
     """Test the streaming transcription functionality"""
@@ -155,45 +364,31 @@ def test_streaming_transcription():
         return
     
     try:
-        # Test 1: Start a microphone stream
-        stream_id = "test_mic_stream"
-        if client.start_stream(stream_id, "microphone"):
-            
-            # Send some test audio chunks
-            print("📤 Sending test audio chunks...")
-            for i in range(5):
-                # Generate 2 seconds of test audio
-                audio_data = generate_test_audio(2.0, frequency=440.0 + i*100)
-                
-                if client.send_audio_chunk(stream_id, audio_data):
-                    print(f"   Chunk {i+1}/5 sent successfully")
-                    time.sleep(1)  # Wait between chunks
-                else:
-                    print(f"   Failed to send chunk {i+1}")
-                    break
-            
-            # Stop the stream
-            client.stop_stream(stream_id)
+        # Run a microphone and a system audio stream side by side on the one connection
+        mic_stream_id = "test_mic_stream"
+        system_stream_id = "test_system_stream"
+        started, senders = [], []
+        
+        if client.start_stream(mic_stream_id, "microphone"):
+            started.append(mic_stream_id)
+            # 5 chunks of 2 seconds
+            senders.append(threading.Thread(target=send_test_chunks, args=(client, mic_stream_id, "Mic", 5, 2.0, 440.0, 100.0)))
         
-        # Test 2: Start a system audio stream
         print("\n🎵 Testing system audio stream...")
-        system_stream_id = "test_system_stream"
         if client.start_stream(system_stream_id, "system"):
-            
-            # Send some test audio chunks
-            for i in range(3):
-                # Generate 3 seconds of test audio
-                audio_data = generate_test_audio(3.0, frequency=220.0 + i*50)
-                
-                if client.send_audio_chunk(system_stream_id, audio_data):
-                    print(f"   System chunk {i+1}/3 sent successfully")
-                    time.sleep(1.5)
-                else:
-                    print(f"   Failed to send system chunk {i+1}")
-                    break
-            
-            # Stop the stream
-            client.stop_stream(system_stream_id)
+            started.append(system_stream_id)
+            # 3 chunks of 3 seconds
+            senders.append(threading.Thread(target=send_test_chunks, args=(client, system_stream_id, "System", 3, 3.0, 220.0, 50.0)))
+        
+        print("📤 Sending test audio chunks...")
+        for sender in senders:
+            sender.start()
+        for sender in senders:
+            sender.join()
+        
+        # Stop the streams
+        for stream_id in started:
+            client.stop_stream(stream_id)
         
         print("\n✅ Streaming test completed successfully!")
         
@@ -223,8 +418,11 @@ def test_legacy_dual_stream():
                 'stream_type': 'microphone'
             }
             
+            # Sent as a frame like every other request, so the reader thread gets a
+            # framed reply it can parse
             print("📤 Testing legacy dual stream format...")
-            client.socket.send(json.dumps(request).encode() + b'\n')
+            result = client._request(request)
+            print(f"📥 Response: {result}")
             
             # Note: This won't work without a real audio file
             print("⚠️  Legacy test requires actual audio file")
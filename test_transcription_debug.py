@@ -1,17 +1,81 @@
 #!/usr/bin/env python3
 import socket
-import json
+import struct
 import time
+import msgpack
 
-def test_transcription():
-    # Wait for transcription service to be ready
-    time.sleep(3)
+# Same 4-byte big-endian length prefix the server uses for MessagePack frames
+FRAME_HEADER = struct.Struct('>I')
+
+# How long to keep retrying while the transcription service starts up
+CONNECT_TIMEOUT = 10.0
+CONNECT_RETRY_DELAY = 0.05
+
+_sock = None
+
+def _connect():
+    """Connect to the service, retrying until it accepts or CONNECT_TIMEOUT passes"""
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    delay = CONNECT_RETRY_DELAY
+    while True:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        sock.settimeout(0.5)
+        try:
+            sock.connect(('localhost', 9001))
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+            continue
+        # Transcription can take a while, so block without a timeout once connected
+        sock.settimeout(None)
+        return sock
+
+def _get_sock():
+    """Connect on first use and reuse the connection for later requests"""
+    global _sock
+    if _sock is None:
+        _sock = _connect()
+    return _sock
+
+def _close_sock():
+    """Drop the cached connection so the next request reconnects"""
+    global _sock
+    if _sock is not None:
+        _sock.close()
+        _sock = None
+
+def _recv_exact(sock, size):
+    """Read exactly size bytes from the socket"""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if not n:
+            raise ConnectionError("Server closed the connection")
+        received += n
+    return buf
+
+def _request(request):
+    """Send one framed request and return the final (non live_text) response"""
+    sock = _get_sock()
+    body = msgpack.packb(request, use_bin_type=True)
+    sock.sendall(FRAME_HEADER.pack(len(body)) + body)
     
+    while True:
+        length, = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+        response = msgpack.unpackb(_recv_exact(sock, length), raw=False)
+        if response.get('type') != 'live_text':
+            return response
+
+def test_transcription():
     try:
-        # Connect to transcription service
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect(('localhost', 9001))
-        
         # Send a system audio chunk for transcription
         request = {
             'type': 'dual_stream_chunk',
@@ -20,17 +84,16 @@ def test_transcription():
         }
         
         print(f"Sending request: {request}")
-        sock.send(json.dumps(request).encode() + b'\n')
-        
-        # Receive response
-        data = sock.recv(8192)
-        response = json.loads(data.decode().strip())
+        response = _request(request)
         
         print(f"Response: {response}")
-        sock.close()
-        
+    
     except Exception as e:
+        _close_sock()
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    test_transcription() 
\ No newline at end of file
+    try:
+        test_transcription()
+    finally:
+        _close_sock()
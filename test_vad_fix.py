@@ -6,21 +6,25 @@ This will verify that the new VAD settings improve transcription success
 
 import sys
 import os
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Sets the OpenMP thread default, so it comes before faster_whisper
+from whisper_test_common import CPU_THREADS, MAX_PARALLEL_FILES, find_wav_files, run_captured
+
 from faster_whisper import WhisperModel
 
 PRESERVED_FILES_DIR = os.path.expanduser("~/Documents/Friday_Transcription_Files")
 
-def test_with_new_settings(file_path, model, stream_type):
+def test_with_new_settings(file_path, model, stream_type, log=print):
     """Test with the new VAD settings"""
-    print(f"\n🎯 Testing NEW SETTINGS on: {file_path.name}")
-    print(f"Stream type: {stream_type}")
-    print("=" * 60)
+    log(f"\n🎯 Testing NEW SETTINGS on: {file_path.name}")
+    log(f"Stream type: {stream_type}")
+    log("=" * 60)
     
     try:
         if stream_type == "system":
             # System audio: No VAD (new setting)
-            print("⚙️ Using NO VAD for system audio")
+            log("⚙️ Using NO VAD for system audio")
             segments, info = model.transcribe(
                 str(file_path),
                 beam_size=1,
@@ -31,7 +35,7 @@ def test_with_new_settings(file_path, model, stream_type):
             )
         else:
             # Microphone audio: Less aggressive VAD (new setting)
-            print("⚙️ Using LESS AGGRESSIVE VAD for microphone audio")
+            log("⚙️ Using LESS AGGRESSIVE VAD for microphone audio")
             segments, info = model.transcribe(
                 str(file_path),
                 beam_size=1,
@@ -46,23 +50,23 @@ def test_with_new_settings(file_path, model, stream_type):
                 )
             )
         
-        print(f"📊 Info - Duration: {info.duration:.2f}s, Language: {info.language} ({info.language_probability:.2f})")
+        log(f"📊 Info - Duration: {info.duration:.2f}s, Language: {info.language} ({info.language_probability:.2f})")
         
         # Collect segments
-        transcription = ""
+        text_parts = []
         segment_count = 0
         for segment in segments:
-            transcription += segment.text + " "
+            text_parts.append(segment.text.strip())
             segment_count += 1
-            print(f"🗣️ Segment {segment_count}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)")
+            log(f"🗣️ Segment {segment_count}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)")
         
-        final_text = transcription.strip()
-        print(f"✅ Final transcription: '{final_text}' (length: {len(final_text)})")
+        final_text = " ".join(text_parts)
+        log(f"✅ Final transcription: '{final_text}' (length: {len(final_text)})")
         
         return final_text
         
     except Exception as e:
-        print(f"❌ Error transcribing {file_path.name}: {e}")
+        log(f"❌ Error transcribing {file_path.name}: {e}")
         return None
 
 def main():
@@ -70,32 +74,41 @@ def main():
     print(f"📂 Directory: {PRESERVED_FILES_DIR}")
     
     # Find WAV files
-    wav_files = list(Path(PRESERVED_FILES_DIR).glob("*.wav"))
+    system_files, microphone_files, wav_count = find_wav_files(PRESERVED_FILES_DIR)
     
-    if not wav_files:
+    if not wav_count:
         print("❌ No WAV files found to test")
         return
     
-    # Initialize Whisper model
+    # Test files with new settings (first 3 of each type)
+    system_files = system_files[:3]
+    microphone_files = microphone_files[:3]
+    
+    # One model whose workers decode several files at once, splitting the cores between them.
+    # Threads rather than a process pool: CTranslate2 releases the GIL while decoding, so
+    # this keeps a single copy of the weights, and forking after it has started its
+    # OpenMP threads is not safe.
+    jobs = max(1, min(MAX_PARALLEL_FILES, len(system_files) + len(microphone_files)))
     print("🎤 Initializing Whisper model...")
-    model = WhisperModel("small", device="cpu", compute_type="int8")
+    model = WhisperModel("small", device="cpu", compute_type="int8",
+                         cpu_threads=max(1, CPU_THREADS // jobs), num_workers=jobs)
     print("✅ Model initialized")
     
-    # Test files with new settings
-    system_files = [f for f in wav_files if "_system_" in f.name]
-    microphone_files = [f for f in wav_files if "_microphone_" in f.name]
-    
     successful_transcriptions = 0
     total_tests = 0
     
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    system_results = executor.map(lambda f: run_captured(test_with_new_settings, f, model, "system"), system_files)
+    microphone_results = executor.map(lambda f: run_captured(test_with_new_settings, f, model, "microphone"), microphone_files)
+    
     # Test system files
     if system_files:
         print("\n" + "="*80)
         print("🖥️ TESTING SYSTEM AUDIO FILES (NO VAD)")
         print("="*80)
         
-        for file_path in system_files[:3]:  # Test first 3
-            result = test_with_new_settings(file_path, model, "system")
+        for result, lines in system_results:
+            print("\n".join(lines))
             total_tests += 1
             if result and len(result) > 0:
                 successful_transcriptions += 1
@@ -110,8 +123,8 @@ def main():
         print("🎤 TESTING MICROPHONE AUDIO FILES (LESS AGGRESSIVE VAD)")
         print("="*80)
         
-        for file_path in microphone_files[:3]:  # Test first 3
-            result = test_with_new_settings(file_path, model, "microphone")
+        for result, lines in microphone_results:
+            print("\n".join(lines))
             total_tests += 1
             if result and len(result) > 0:
                 successful_transcriptions += 1
@@ -120,6 +133,8 @@ def main():
                 print("❌ No transcription")
             print("-" * 60)
     
+    executor.shutdown()
+    
     # Summary
     print("\n" + "="*80)
     print("📊 VAD FIX RESULTS")
@@ -6,127 +6,139 @@ This will help us understand why good audio files aren't being transcribed
 
 import sys
 import os
-from pathlib import Path
-from faster_whisper import WhisperModel
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Sets the OpenMP thread default, so it comes before faster_whisper
+from whisper_test_common import CPU_THREADS, MAX_PARALLEL_FILES, find_wav_files, run_captured
+
+import numpy as np
+import soundfile as sf
+from faster_whisper import WhisperModel, decode_audio
 
 PRESERVED_FILES_DIR = os.path.expanduser("~/Documents/Friday_Transcription_Files")
+WHISPER_SAMPLE_RATE = 16000
+
+def load_audio(file_path):
+    """Decode a file once to the 16 kHz mono float32 array Whisper expects"""
+    if sf.info(str(file_path)).samplerate == WHISPER_SAMPLE_RATE:
+        samples, _ = sf.read(str(file_path), dtype='float32', always_2d=False)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1, dtype=np.float32)
+        return samples
+    # Other rates are resampled through ffmpeg, as faster-whisper does for paths
+    return decode_audio(str(file_path), sampling_rate=WHISPER_SAMPLE_RATE)
+
+# Decoder settings compared by this script, keyed by --passes name
+PASSES = {
+    # The exact same settings as the transcription service; segment timestamps
+    # aren't needed for the final text, so the timestamp tokens are skipped
+    "fast": ("fast_settings", "🎤 Transcribing with current settings (fast):", dict(
+        beam_size=1,
+        condition_on_previous_text=False,
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=300),
+        without_timestamps=True,
+        word_timestamps=False
+    )),
+    # More accurate: higher beam size, less aggressive VAD
+    "accurate": ("accurate_settings", "\n🎯 Transcribing with accurate settings:", dict(
+        beam_size=5,
+        condition_on_previous_text=True,
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=1000)
+    )),
+    # Disable VAD completely
+    "novad": ("no_vad", "\n🎯 Transcribing with NO VAD:", dict(
+        beam_size=3,
+        condition_on_previous_text=False,
+        vad_filter=False
+    )),
+}
 
-def test_whisper_on_file(file_path, model):
-    """Test Whisper transcription on a specific file"""
-    print(f"\n🎯 Testing Whisper on: {file_path.name}")
-    print("=" * 60)
+def transcribe_pass(audio, model, options, log=print):
+    """Run one decoder configuration and log its segments; returns the final text"""
+    segments, info = model.transcribe(audio, language="en", temperature=0.0, **options)
+    
+    log(f"📊 Info - Duration: {info.duration:.2f}s, Language: {info.language} ({info.language_probability:.2f})")
+    
+    # Collect segments
+    text_parts = []
+    segment_count = 0
+    for segment in segments:
+        text_parts.append(segment.text.strip())
+        segment_count += 1
+        log(f"🗣️ Segment {segment_count}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)")
+    
+    final_text = " ".join(text_parts)
+    log(f"✅ Final transcription: '{final_text}' (length: {len(final_text)})")
+    return final_text
+
+def test_whisper_on_file(file_path, model, passes=("fast",), log=print):
+    """Test Whisper transcription on a specific file.
+    
+    With only the fast pass selected, the accurate pass still runs as a
+    fallback when the fast pass produces no text.
+    """
+    log(f"\n🎯 Testing Whisper on: {file_path.name}")
+    log("=" * 60)
     
     try:
-        # Test with the exact same settings as the transcription service
-        print("🎤 Transcribing with current settings (fast):")
-        segments, info = model.transcribe(
-            str(file_path),
-            beam_size=1,  # Current fast setting
-            language="en",
-            condition_on_previous_text=False,
-            temperature=0.0,
-            vad_filter=True,
-            vad_parameters=dict(min_silence_duration_ms=300)
-        )
-        
-        print(f"📊 Info - Duration: {info.duration:.2f}s, Language: {info.language} ({info.language_probability:.2f})")
-        
-        # Collect segments
-        transcription = ""
-        segment_count = 0
-        for segment in segments:
-            transcription += segment.text + " "
-            segment_count += 1
-            print(f"🗣️ Segment {segment_count}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)")
-        
-        final_text = transcription.strip()
-        print(f"✅ Final transcription: '{final_text}' (length: {len(final_text)})")
-        
-        # Test with more accurate settings
-        print("\n🎯 Transcribing with accurate settings:")
-        segments2, info2 = model.transcribe(
-            str(file_path),
-            beam_size=5,  # More accurate
-            language="en",
-            condition_on_previous_text=True,
-            temperature=0.0,
-            vad_filter=True,
-            vad_parameters=dict(min_silence_duration_ms=1000)  # Less aggressive VAD
-        )
+        # Decode once; every pass shares the samples
+        audio = load_audio(file_path)
         
-        print(f"📊 Info - Duration: {info2.duration:.2f}s, Language: {info2.language} ({info2.language_probability:.2f})")
+        results = {}
+        for name in passes:
+            key, title, options = PASSES[name]
+            log(title)
+            results[key] = transcribe_pass(audio, model, options, log)
         
-        # Collect segments
-        transcription2 = ""
-        segment_count2 = 0
-        for segment in segments2:
-            transcription2 += segment.text + " "
-            segment_count2 += 1
-            print(f"🗣️ Segment {segment_count2}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)")
+        # Only pay for the beam-5 decode when the fast settings came up empty
+        if tuple(passes) == ("fast",) and not results["fast_settings"]:
+            key, title, options = PASSES["accurate"]
+            log(title)
+            results[key] = transcribe_pass(audio, model, options, log)
         
-        final_text2 = transcription2.strip()
-        print(f"✅ Final transcription: '{final_text2}' (length: {len(final_text2)})")
-        
-        # Test with no VAD
-        print("\n🎯 Transcribing with NO VAD:")
-        segments3, info3 = model.transcribe(
-            str(file_path),
-            beam_size=3,
-            language="en",
-            condition_on_previous_text=False,
-            temperature=0.0,
-            vad_filter=False  # Disable VAD completely
-        )
-        
-        print(f"📊 Info - Duration: {info3.duration:.2f}s, Language: {info3.language} ({info3.language_probability:.2f})")
-        
-        # Collect segments
-        transcription3 = ""
-        segment_count3 = 0
-        for segment in segments3:
-            transcription3 += segment.text + " "
-            segment_count3 += 1
-            print(f"🗣️ Segment {segment_count3}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)")
-        
-        final_text3 = transcription3.strip()
-        print(f"✅ Final transcription: '{final_text3}' (length: {len(final_text3)})")
-        
-        return {
-            "fast_settings": final_text,
-            "accurate_settings": final_text2,
-            "no_vad": final_text3
-        }
+        return results
         
     except Exception as e:
-        print(f"❌ Error transcribing {file_path.name}: {e}")
+        log(f"❌ Error transcribing {file_path.name}: {e}")
         return None
 
 def main():
-    if len(sys.argv) > 1:
-        preserved_dir = sys.argv[1]
-    else:
-        preserved_dir = PRESERVED_FILES_DIR
+    parser = argparse.ArgumentParser(description="Test Whisper transcription on preserved files")
+    parser.add_argument("directory", nargs='?', default=PRESERVED_FILES_DIR,
+                        help="Directory of preserved WAV files (default: %(default)s)")
+    parser.add_argument("--passes", choices=['fast', 'accurate', 'novad', 'all'], default='fast',
+                        help="Decoder settings to compare; fast falls back to accurate when it finds no text (default: fast)")
+    args = parser.parse_args()
+    preserved_dir = args.directory
+    passes = tuple(PASSES) if args.passes == 'all' else (args.passes,)
     
     print(f"🔍 Testing Whisper Transcription")
     print(f"📂 Directory: {preserved_dir}")
     
     # Find WAV files
-    wav_files = list(Path(preserved_dir).glob("*.wav"))
+    system_files, microphone_files, wav_count = find_wav_files(preserved_dir)
     
-    if not wav_files:
+    if not wav_count:
         print("❌ No WAV files found to test")
         return
     
-    # Initialize Whisper model (same as transcription service)
+    # Test a few files of each type
+    print(f"\nFound {len(system_files)} system files, {len(microphone_files)} microphone files")
+    
+    # Initialize Whisper model (same as transcription service); its workers decode
+    # several files at once, splitting the cores between them
+    jobs = max(1, min(MAX_PARALLEL_FILES, len(system_files[:2]) + len(microphone_files[:2])))
     print("🎤 Initializing Whisper model...")
-    model = WhisperModel("small", device="cpu", compute_type="int8")
+    model = WhisperModel("small", device="cpu", compute_type="int8",
+                         cpu_threads=max(1, CPU_THREADS // jobs), num_workers=jobs)
     print("✅ Model initialized")
     
-    # Test a few files of each type
-    system_files = [f for f in wav_files if "_system_" in f.name]
-    microphone_files = [f for f in wav_files if "_microphone_" in f.name]
-    
-    print(f"\nFound {len(system_files)} system files, {len(microphone_files)} microphone files")
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    system_results = executor.map(lambda f: run_captured(test_whisper_on_file, f, model, passes), system_files[:2])
+    microphone_results = executor.map(lambda f: run_captured(test_whisper_on_file, f, model, passes), microphone_files[:2])
     
     # Test 2 system files
     if system_files:
@@ -134,8 +146,8 @@ def main():
         print("🖥️ TESTING SYSTEM AUDIO FILES")
         print("="*80)
         
-        for i, file_path in enumerate(system_files[:2]):
-            result = test_whisper_on_file(file_path, model)
+        for i, (result, lines) in enumerate(system_results):
+            print("\n".join(lines))
             if i < len(system_files) - 1:
                 print("\n" + "-"*60)
     
@@ -145,11 +157,13 @@ def main():
         print("🎤 TESTING MICROPHONE AUDIO FILES")
         print("="*80)
         
-        for i, file_path in enumerate(microphone_files[:2]):
-            result = test_whisper_on_file(file_path, model)
+        for i, (result, lines) in enumerate(microphone_results):
+            print("\n".join(lines))
             if i < len(microphone_files) - 1:
                 print("\n" + "-"*60)
     
+    executor.shutdown()
+    
     print("\n" + "="*80)
     print("🎯 CONCLUSION")
     print("="*80)
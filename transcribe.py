@@ -1,25 +1,54 @@
 #!/usr/bin/env python3
 import sys
 import os
+import base64
 import json
+import logging
 import tempfile
 import threading
 import queue
+import re
 import socket
 import time
+import weakref
 import av
+import msgpack
+import orjson
 import numpy as np
 import fcntl  # For file locking
+import itertools
+import platform
 import atexit  # For cleanup on exit
 import shutil  # For file operations
 from datetime import datetime
+
+from cpu_cores import physical_cpu_count
+
+# CTranslate2's int8 GEMMs scale with physical cores; the OpenMP settings have to be
+# in place before faster_whisper is imported
+CPU_THREADS = physical_cpu_count()
+os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(CPU_THREADS))
+os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact")
+
+import ctranslate2
 from faster_whisper import WhisperModel
-from sentence_transformers import SentenceTransformer, util
-from typing import List, Dict, Optional, Tuple
-import io
+from faster_whisper.vad import SpeechTimestampsMap, VadOptions, get_speech_timestamps
+from sentence_transformers import SentenceTransformer
+from typing import Callable, List, Dict, Optional, Tuple
 import wave
 import struct
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Service log on stderr. Per-chunk details are logged at DEBUG so the hot path doesn't
+# write several lines per chunk; FRIDAY_TRANSCRIBE_LOG_LEVEL=DEBUG brings them back
+logger = logging.getLogger("transcribe")
+logger.setLevel(os.environ.get("FRIDAY_TRANSCRIBE_LOG_LEVEL", "INFO").upper())
+_log_handler = logging.StreamHandler(sys.stderr)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+logger.addHandler(_log_handler)
+logger.propagate = False
 
 # Configuration for file preservation
 PRESERVE_TRANSCRIPTION_FILES = True  # Set to False to revert to old behavior
@@ -31,6 +60,274 @@ WHISPER_SAMPLE_RATE = 16000  # Whisper's required sample rate
 MIN_CHUNK_DURATION_MS = 2000  # Minimum duration before sending chunk
 SENTENCE_TIMEOUT_MS = 1000  # Emit incomplete sentence after 1 second of silence
 BUFFER_OVERLAP_MS = 1000  # 1 second overlap between chunks for continuity
+# Streams are processed as soon as a full chunk arrives; this interval only paces the
+# check for shorter chunks that become due after CHUNK_DURATION_MS without one
+STREAM_POLL_INTERVAL_S = 1.0
+RECENT_SEGMENT_HASHES = 16  # Recent segments checked for duplicates
+PARTIAL_UPDATE_INTERVAL_MS = 250  # Minimum gap between partial sentence updates of a stream
+LIVE_TEXT_INTERVAL_MS = 100  # Minimum gap between live_text updates while a file chunk decodes
+# Markers Whisper emits for stretches without speech, removed from segment text in one pass
+NON_SPEECH_MARKER_RE = re.compile(r"\[(?:BLANK_AUDIO|AUDIO OUT)\]")
+
+# Whisper inference configuration. A CUDA GPU is used when CTranslate2 can see one
+# (it has no Metal backend, so Apple Silicon stays on the CPU)
+WHISPER_DEVICE = os.environ.get("FRIDAY_WHISPER_DEVICE") or (
+    "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+)
+# int8 weights with float16 activations on the GPU. On the CPU int8 uses VNNI dot
+# products where available; without VNNI int8_float32 can be as fast, so it's overridable
+WHISPER_COMPUTE_TYPE = os.environ.get(
+    "FRIDAY_WHISPER_COMPUTE_TYPE", "int8_float16" if WHISPER_DEVICE == "cuda" else "int8"
+)
+# Microphone and system chunks can be decoded side by side. cpu_threads applies per
+# worker, so the physical cores are split between the workers rather than each
+# worker claiming all of them and the two competing for the same SIMD units
+WHISPER_NUM_WORKERS = 2
+WHISPER_CPU_THREADS = max(1, CPU_THREADS // WHISPER_NUM_WORKERS)
+# Chunks are always transcribed as English, so the English-only distilled model
+# applies: about half the decoder cost of "small" at similar accuracy
+WHISPER_MODEL = os.environ.get("FRIDAY_WHISPER_MODEL", "distil-small.en")
+# Greedy decoding at a single temperature of 0, so there is no higher temperature to
+# retry at. A window is only dropped as silent when its no_speech probability is high
+# and its average log probability is below log_prob_threshold, so a confident decode
+# of quiet (e.g. system) audio is kept
+WHISPER_DECODE_OPTIONS = dict(
+    beam_size=1,
+    language="en",
+    condition_on_previous_text=False,
+    temperature=[0.0],
+    log_prob_threshold=-1.0,
+    no_speech_threshold=0.6,
+)
+# Full transcribe() arguments, built once. Whisper's own VAD stays off: system audio
+# runs without VAD, and microphone audio is passed in already cut down to its speech
+TRANSCRIBE_OPTIONS = dict(WHISPER_DECODE_OPTIONS, vad_filter=False)
+# Lenient VAD for microphone audio (1000ms silence threshold, was 300ms). It runs once
+# per chunk: the same speech timestamps gate the chunk and select the audio Whisper gets
+MICROPHONE_VAD_OPTIONS = VadOptions(
+    min_silence_duration_ms=1000,  # Less aggressive
+    speech_pad_ms=400,             # More padding around speech
+    max_speech_duration_s=30       # Allow longer speech segments
+)
+# Characters of a stream's previous transcript passed to Whisper as the next chunk's
+# initial_prompt. Unlike condition_on_previous_text it costs only a few prompt tokens,
+# and it carries context (names, terms, casing) across chunk boundaries
+PROMPT_CONTEXT_CHARS = 200
+# Microphone chunks with less (padded) speech than this by Silero VAD skip Whisper entirely
+MIN_SPEECH_MS = 300
+# Streamed chunks below both levels (float samples) are treated as silence. Both have
+# to be low: a short utterance in a long quiet chunk can still have a very low RMS
+SILENT_CHUNK_PEAK = 0.01
+SILENT_CHUNK_RMS = 0.002
+# Client connections served at once; further connections wait to be picked up
+MAX_CLIENT_CONNECTIONS = 8
+# File chunks of one stream a connection can have transcribing while it reads the next
+DUAL_STREAM_PIPELINE_DEPTH = 2
+
+# Binary clients send MessagePack requests framed by a 4-byte big-endian length.
+# Text clients send newline-terminated JSON or file paths; a frame's length prefix
+# starts with a zero byte, which never begins a text message.
+FRAME_HEADER = struct.Struct('>I')
+
+# Send buffer for client connections, so larger responses rarely block mid-write
+CLIENT_SNDBUF_BYTES = 256 * 1024
+# Receive buffer for client connections, large enough for a few seconds of streamed audio
+CLIENT_RCVBUF_BYTES = 1024 * 1024
+# Bytes read per recv_into; one scratch buffer of this size is reused per connection
+RECV_CHUNK_BYTES = 256 * 1024
+
+def sendmsg_all(conn, buffers) -> None:
+    """Write the buffers in one gathered sendmsg, continuing after a partial send"""
+    views = [memoryview(buffer) for buffer in buffers]
+    while views:
+        sent = conn.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if sent:
+            views[0] = views[0][sent:]
+
+# Alert results are sent from the alert thread while the client's own thread may be
+# replying too, so each connection's writes are serialized
+_send_locks = weakref.WeakKeyDictionary()
+_send_locks_guard = threading.Lock()
+
+def connection_send_lock(conn) -> threading.Lock:
+    """The lock serializing writes to a client connection"""
+    with _send_locks_guard:
+        lock = _send_locks.get(conn)
+        if lock is None:
+            lock = _send_locks[conn] = threading.Lock()
+        return lock
+
+def send_response(conn, result: Dict, framed: bool = False) -> None:
+    """Send a response in the framing the request arrived in"""
+    if framed:
+        body = msgpack.packb(result, use_bin_type=True)
+        buffers = (FRAME_HEADER.pack(len(body)), body)
+    else:
+        # orjson writes the bytes and trailing newline in one call; numpy scalars pass through
+        buffers = (orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE),)
+    with connection_send_lock(conn):
+        sendmsg_all(conn, buffers)
+
+class ChunkResultSender:
+    """Sends one stream's chunk results in arrival order while later chunks already transcribe"""
+    def __init__(self, conn):
+        self.conn = conn
+        # A chunk beyond the pipeline depth waits for a slot, which also stops the
+        # connection's reads until a result has gone out
+        self.slots = threading.BoundedSemaphore(DUAL_STREAM_PIPELINE_DEPTH)
+        self.pending = deque()  # (future, framed) in arrival order
+        self.lock = threading.Lock()
+    
+    def submit(self, pool, framed: bool, fn, *args) -> None:
+        """Run fn(*args) on the pool and send its result once earlier chunks' results are out"""
+        self.slots.acquire()
+        with self.lock:
+            future = pool.submit(fn, *args)
+            self.pending.append((future, framed))
+        future.add_done_callback(self._send_ready)
+    
+    def _send_ready(self, _future=None) -> None:
+        """Send every finished result at the front of the queue"""
+        with self.lock:
+            while self.pending and self.pending[0][0].done():
+                future, framed = self.pending.popleft()
+                try:
+                    result = future.result()
+                    send_response(self.conn, result, framed)
+                    logger.debug(f"📤 Sent {result.get('stream_type', 'unknown')}: {result.get('type', 'unknown')}")
+                except Exception as e:
+                    logger.error(f"❌ Failed to send chunk result: {e}")
+                finally:
+                    self.slots.release()
+    
+    def wait(self) -> None:
+        """Block until every submitted chunk's result has been sent"""
+        for _ in range(DUAL_STREAM_PIPELINE_DEPTH):
+            self.slots.acquire()
+        for _ in range(DUAL_STREAM_PIPELINE_DEPTH):
+            self.slots.release()
+
+# Finds where one JSON object ends in text that may run on into the next message
+_JSON_DECODER = json.JSONDecoder()
+
+class ClientMessageReader:
+    """Splits a client connection into text lines and MessagePack frames"""
+    def __init__(self, conn):
+        self.conn = conn
+        self.buffer = bytearray()
+        # Reused for every read, so receiving allocates no new bytes objects
+        self.scratch = bytearray(RECV_CHUNK_BYTES)
+        self.scratch_view = memoryview(self.scratch)
+    
+    def read_message(self):
+        """Return the next message as bytes (text line) or a dict (frame), or None on disconnect"""
+        buffer = self.buffer
+        while True:
+            if buffer and buffer[0] == 0:
+                if len(buffer) >= FRAME_HEADER.size:
+                    end = FRAME_HEADER.size + FRAME_HEADER.unpack_from(buffer)[0]
+                    if len(buffer) >= end:
+                        # Unpack straight from the receive buffer; binary fields such as
+                        # audio_data are copied out once, with no intermediate body copy
+                        with memoryview(buffer) as view, view[FRAME_HEADER.size:end] as body:
+                            message = msgpack.unpackb(body, raw=False)
+                        del buffer[:end]
+                        return message
+            elif buffer:
+                # JSON objects end where the object does, newline or not: older clients
+                # send check_alerts unterminated, so it can run straight into the next request
+                if buffer.lstrip()[:1] == b'{':
+                    message = self._take_json_object()
+                    if message is not None:
+                        return message
+                else:
+                    newline = buffer.find(b'\n')
+                    if newline >= 0:
+                        line = bytes(buffer[:newline])
+                        del buffer[:newline + 1]
+                        return line
+            
+            received = self.conn.recv_into(self.scratch_view)
+            if not received:
+                return None
+            buffer += self.scratch_view[:received]
+
+    def _take_json_object(self) -> Optional[bytes]:
+        """Remove and return the complete JSON object at the front of the buffer, if any.
+        
+        An object that doesn't parse yet is assumed incomplete, unless a newline already
+        follows it: then the line is returned as is and reported as malformed.
+        """
+        buffer = self.buffer
+        # surrogateescape maps every byte to one character and back, so character
+        # offsets convert to byte offsets exactly
+        text = buffer.decode('utf-8', 'surrogateescape')
+        start = len(text) - len(text.lstrip())
+        try:
+            _, end = _JSON_DECODER.raw_decode(text, start)
+        except ValueError:
+            newline = buffer.find(b'\n')
+            if newline < 0:
+                return None
+            line = bytes(buffer[:newline])
+            del buffer[:newline + 1]
+            return line
+        end_bytes = len(text[:end].encode('utf-8', 'surrogateescape'))
+        message = bytes(buffer[:end_bytes])
+        # Drop the newline (and any other whitespace) that terminates the object
+        rest = len(buffer) - end_bytes - len(buffer[end_bytes:].lstrip())
+        del buffer[:end_bytes + rest]
+        return message
+
+def _frame_to_float32(frame) -> Optional[np.ndarray]:
+    """Samples of a 16kHz mono float or PCM16 frame as float32, or None if it needs resampling"""
+    if frame.sample_rate != WHISPER_SAMPLE_RATE or len(frame.layout.channels) != 1:
+        return None
+    if frame.format.name in ('flt', 'fltp'):
+        return frame.to_ndarray().reshape(-1)
+    if frame.format.name in ('s16', 's16p'):
+        samples = frame.to_ndarray().reshape(-1).astype(np.float32)
+        samples *= np.float32(1.0 / 32768.0)
+        return samples
+    return None
+
+def speech_timestamps(samples: np.ndarray) -> List[Dict]:
+    """Speech sample ranges Silero VAD finds in 16kHz float32 microphone samples"""
+    return get_speech_timestamps(samples, MICROPHONE_VAD_OPTIONS, sampling_rate=WHISPER_SAMPLE_RATE)
+
+def speech_duration_ms(speech: List[Dict]) -> float:
+    """Total milliseconds covered by speech timestamps"""
+    return sum(chunk['end'] - chunk['start'] for chunk in speech) * 1000.0 / WHISPER_SAMPLE_RATE
+
+def speech_audio(samples: np.ndarray, speech: List[Dict]) -> np.ndarray:
+    """The speech ranges of samples joined end to end, as Whisper's vad_filter would pass them"""
+    return np.concatenate([samples[chunk['start']:chunk['end']] for chunk in speech])
+
+class PromptContext:
+    """The end of one stream's latest transcript, prompting the stream's next chunk.
+    
+    Chunks of a stream can transcribe concurrently and finish out of order, so text is
+    only taken from a chunk later than the one it was last taken from.
+    """
+    def __init__(self):
+        self.text: Optional[str] = None
+        self.chunk_id = -1
+        self.chunk_ids = itertools.count()  # Order of chunks without an id of their own
+        self.lock = threading.Lock()
+    
+    def remember(self, text: str, chunk_id: int) -> None:
+        """Keep the last PROMPT_CONTEXT_CHARS of a chunk's transcript, cut at a word boundary"""
+        text = text.strip()
+        if not text:
+            return
+        if len(text) > PROMPT_CONTEXT_CHARS:
+            text = text[-PROMPT_CONTEXT_CHARS:].split(' ', 1)[-1]
+        with self.lock:
+            if chunk_id > self.chunk_id:
+                self.text, self.chunk_id = text, chunk_id
 
 class TranscriptSegment:
     """Represents a transcript segment with timing information"""
@@ -42,73 +339,119 @@ class TranscriptSegment:
 class TranscriptAccumulator:
     """Accumulates transcript segments and manages sentence boundaries"""
     def __init__(self):
-        self.current_sentence = ""
+        # Cleaned text of the segments in the current sentence, joined when it's emitted
+        self.sentence_parts: List[str] = []
         self.sentence_start_time = 0.0
         self.last_update_time = time.time()
-        self.last_segment_hash = 0
+        self.last_partial_time = 0.0
+        # Hashes of recently added segments, so a repeat is dropped even when other
+        # segments came in between
+        self.recent_hashes = deque(maxlen=RECENT_SEGMENT_HASHES)
+        self.recent_hash_set = set()
         self.segments_buffer = deque(maxlen=50)  # Keep recent segments for context
     
     def add_segment(self, segment: TranscriptSegment, stream_type: str) -> Optional[Dict]:
         """Add a segment and return a transcript update if a sentence is complete"""
-        print(f"🔍 Processing new transcript segment ({stream_type}): {segment.text}", file=sys.stderr, flush=True)
+        logger.debug(f"🔍 Processing new transcript segment ({stream_type}): {segment.text}")
         
         # Update the last update time
         self.last_update_time = time.time()
         
         # Clean up the text (remove [BLANK_AUDIO], [AUDIO OUT] and trim)
-        clean_text = segment.text.replace("[BLANK_AUDIO]", "").replace("[AUDIO OUT]", "").strip()
+        clean_text = NON_SPEECH_MARKER_RE.sub("", segment.text).strip()
         
         if not clean_text or (segment.end_time - segment.start_time) < 1.0:
             return None
         
         # Calculate hash to detect duplicates
-        segment_hash = hash((clean_text, segment.start_time, segment.end_time))
-        if segment_hash == self.last_segment_hash:
+        segment_hash = (hash(clean_text) ^ (int(segment.start_time * 100) << 20)
+                        ^ int(segment.end_time * 100))
+        if segment_hash in self.recent_hash_set:
             return None
-        self.last_segment_hash = segment_hash
+        if len(self.recent_hashes) == self.recent_hashes.maxlen:
+            self.recent_hash_set.discard(self.recent_hashes[0])
+        self.recent_hashes.append(segment_hash)
+        self.recent_hash_set.add(segment_hash)
         
         # Add to buffer for context
         self.segments_buffer.append(segment)
         
         # If this is the start of a new sentence, store the start time
-        if not self.current_sentence:
+        if not self.sentence_parts:
             self.sentence_start_time = segment.start_time
         
-        # Add the new text with proper spacing
-        if self.current_sentence and not self.current_sentence.endswith(' '):
-            self.current_sentence += ' '
-        self.current_sentence += clean_text
+        # Add the new text; parts are space-separated when joined
+        self.sentence_parts.append(clean_text)
         
         # Check if we have a complete sentence
         if clean_text.endswith('.') or clean_text.endswith('?') or clean_text.endswith('!'):
-            sentence = self.current_sentence.strip()
-            self.current_sentence = ""
+            sentence = self.take_sentence()
             
             update = {
                 "text": sentence,
                 "timestamp": f"{self.sentence_start_time:.1f} - {segment.end_time:.1f}",
                 "source": stream_type,
-                "stream_type": stream_type
+                "stream_type": stream_type,
+                "partial": False
             }
-            print(f"✅ Generated transcript update ({stream_type}): {update}", file=sys.stderr, flush=True)
+            logger.debug(f"✅ Generated transcript update ({stream_type}): {update}")
             return update
         
         return None
     
+    def take_sentence(self) -> str:
+        """Return the current sentence's text and start a new sentence"""
+        sentence = " ".join(self.sentence_parts)
+        self.sentence_parts.clear()
+        return sentence
+    
+    def flush(self, stream_type: str) -> Optional[Dict]:
+        """Emit the current sentence, complete or not, when its stream ends"""
+        if not self.sentence_parts:
+            return None
+        sentence = self.take_sentence()
+        
+        return {
+            "text": sentence,
+            "timestamp": f"{self.sentence_start_time:.1f} - {self.segments_buffer[-1].end_time:.1f}",
+            "source": stream_type,
+            "stream_type": stream_type,
+            "partial": False
+        }
+    
+    def partial_update(self, stream_type: str) -> Optional[Dict]:
+        """Return the unfinished sentence so far, at most once per PARTIAL_UPDATE_INTERVAL_MS.
+        
+        Lets clients show text before Whisper emits terminal punctuation or the
+        sentence times out; the final update for the sentence replaces it.
+        """
+        now = time.time()
+        if not self.sentence_parts or now - self.last_partial_time < PARTIAL_UPDATE_INTERVAL_MS / 1000.0:
+            return None
+        self.last_partial_time = now
+        
+        return {
+            "text": " ".join(self.sentence_parts),
+            "timestamp": f"{self.sentence_start_time:.1f} - {self.segments_buffer[-1].end_time:.1f}",
+            "source": stream_type,
+            "stream_type": stream_type,
+            "partial": True
+        }
+    
     def check_timeout(self, stream_type: str) -> Optional[Dict]:
         """Check if current sentence should be emitted due to timeout"""
-        if (self.current_sentence and 
+        if (self.sentence_parts and 
             time.time() - self.last_update_time > SENTENCE_TIMEOUT_MS / 1000.0):
             
-            sentence = self.current_sentence.strip()
-            self.current_sentence = ""
+            sentence = self.take_sentence()
             current_time = self.sentence_start_time + (SENTENCE_TIMEOUT_MS / 1000.0)
             
             update = {
                 "text": sentence,
                 "timestamp": f"{self.sentence_start_time:.1f} - {current_time:.1f}",
                 "source": stream_type,
-                "stream_type": stream_type
+                "stream_type": stream_type,
+                "partial": False
             }
             return update
         return None
@@ -118,33 +461,45 @@ class AudioStreamBuffer:
     def __init__(self, stream_type: str, sample_rate: int = WHISPER_SAMPLE_RATE):
         self.stream_type = stream_type
         self.sample_rate = sample_rate
-        self.audio_buffer = deque()
+        # Incoming sample arrays, joined only when a chunk is taken
+        self.audio_buffer: List[np.ndarray] = []
+        self.buffered_samples = 0
         self.buffer_lock = threading.Lock()
         self.total_samples = 0
         self.last_chunk_time = time.time()
         self.accumulator = TranscriptAccumulator()
+        self.prompt_context = PromptContext()
         
         # Chunk configuration
         self.chunk_samples = int(sample_rate * (CHUNK_DURATION_MS / 1000.0))
         self.min_samples = int(sample_rate * (MIN_CHUNK_DURATION_MS / 1000.0))
         self.overlap_samples = int(sample_rate * (BUFFER_OVERLAP_MS / 1000.0))
         
-        print(f"🎵 Initialized audio buffer for {stream_type}: chunk_samples={self.chunk_samples}, min_samples={self.min_samples}", file=sys.stderr, flush=True)
+        logger.info(f"🎵 Initialized audio buffer for {stream_type}: chunk_samples={self.chunk_samples}, min_samples={self.min_samples}")
     
-    def add_audio_data(self, audio_data: bytes) -> None:
-        """Add raw audio data to the buffer"""
+    def add_audio_data(self, audio_data: bytes, dtype: str = 'f32le') -> bool:
+        """Add raw audio data to the buffer ('f32le' float or 's16le' PCM16 samples).
+        
+        Returns True when the buffer now holds a full chunk.
+        """
         with self.buffer_lock:
-            # Convert bytes to float32 samples (assuming 32-bit float input)
-            samples = np.frombuffer(audio_data, dtype=np.float32)
-            self.audio_buffer.extend(samples)
+            if dtype == 's16le':
+                # Scale PCM16 to float32 in [-1, 1) for Whisper
+                samples = np.frombuffer(audio_data, dtype='<i2').astype(np.float32)
+                samples *= np.float32(1.0 / 32768.0)
+            else:
+                samples = np.frombuffer(audio_data, dtype='<f4')
+            self.audio_buffer.append(samples)
+            self.buffered_samples += len(samples)
             self.total_samples += len(samples)
             
-            print(f"🔊 Added {len(samples)} samples to {self.stream_type} buffer (total: {self.total_samples})", file=sys.stderr, flush=True)
+            logger.debug("🔊 Added %d samples to %s buffer (total: %d)", len(samples), self.stream_type, self.total_samples)
+            return self.buffered_samples >= self.chunk_samples
     
     def get_chunk_if_ready(self) -> Optional[np.ndarray]:
         """Get audio chunk if ready for processing"""
         with self.buffer_lock:
-            current_buffer_size = len(self.audio_buffer)
+            current_buffer_size = self.buffered_samples
             
             # Check if we should process based on size or time
             time_since_last = time.time() - self.last_chunk_time
@@ -156,17 +511,18 @@ class AudioStreamBuffer:
             if should_process and current_buffer_size > 0:
                 # Extract chunk (up to chunk_samples)
                 chunk_size = min(current_buffer_size, self.chunk_samples)
-                chunk = np.array([self.audio_buffer.popleft() for _ in range(chunk_size)])
+                buffered = np.concatenate(self.audio_buffer) if len(self.audio_buffer) > 1 else self.audio_buffer[0]
+                chunk = buffered[:chunk_size]
                 
-                # Keep overlap samples for continuity
+                # Keep overlap samples for continuity: they stay at the front of the buffer,
+                # copied so the rest of the joined array can be freed
                 overlap_size = min(self.overlap_samples, chunk_size)
-                if overlap_size > 0:
-                    overlap_data = chunk[-overlap_size:]
-                    # Put overlap back at the beginning
-                    self.audio_buffer.extendleft(reversed(overlap_data))
+                remaining = buffered[chunk_size - overlap_size:].copy()
+                self.audio_buffer = [remaining] if len(remaining) else []
+                self.buffered_samples = len(remaining)
                 
                 self.last_chunk_time = time.time()
-                print(f"📦 Extracted chunk from {self.stream_type}: {len(chunk)} samples (overlap: {overlap_size})", file=sys.stderr, flush=True)
+                logger.debug(f"📦 Extracted chunk from {self.stream_type}: {len(chunk)} samples (overlap: {overlap_size})")
                 return chunk
         
         return None
@@ -175,16 +531,22 @@ class AudioStreamBuffer:
         """Clear the audio buffer"""
         with self.buffer_lock:
             self.audio_buffer.clear()
+            self.buffered_samples = 0
             self.total_samples = 0
-            print(f"🧹 Cleared {self.stream_type} audio buffer", file=sys.stderr, flush=True)
+            logger.info(f"🧹 Cleared {self.stream_type} audio buffer")
 
 class StreamingTranscriptionServer:
     """Enhanced transcription server with streaming capabilities"""
-    def __init__(self):
+    def __init__(self, final_chunk_handler: Optional[Callable[[AudioStreamBuffer, np.ndarray], None]] = None):
+        # Called with a stopped stream's buffer and the audio still left in it
+        self.final_chunk_handler = final_chunk_handler
         self.audio_buffers: Dict[str, AudioStreamBuffer] = {}
         self.active_streams = set()
         self.processing_thread = None
         self.running = True
+        # Streams holding a full chunk; the processing thread waits on the condition
+        self.ready_streams = set()
+        self.ready_condition = threading.Condition()
         
     def start_stream(self, stream_id: str, stream_type: str) -> Dict:
         """Start a new audio stream"""
@@ -194,7 +556,7 @@ class StreamingTranscriptionServer:
         self.audio_buffers[stream_id] = AudioStreamBuffer(stream_type)
         self.active_streams.add(stream_id)
         
-        print(f"🎬 Started audio stream: {stream_id} ({stream_type})", file=sys.stderr, flush=True)
+        logger.info(f"🎬 Started audio stream: {stream_id} ({stream_type})")
         return {"success": True, "stream_id": stream_id}
     
     def stop_stream(self, stream_id: str) -> Dict:
@@ -202,33 +564,101 @@ class StreamingTranscriptionServer:
         if stream_id not in self.audio_buffers:
             return {"success": False, "error": "Stream not found"}
         
-        # Process any remaining audio in buffer
+        # Process any remaining audio in buffer; less than a minimum chunk is
+        # mostly the overlap with the chunk before it
         buffer = self.audio_buffers[stream_id]
+        remaining_chunk = None
         with buffer.buffer_lock:
-            if len(buffer.audio_buffer) > 0:
-                remaining_chunk = np.array(list(buffer.audio_buffer))
-                # Process remaining chunk...
-                print(f"🔄 Processing final chunk for stream {stream_id}: {len(remaining_chunk)} samples", file=sys.stderr, flush=True)
+            if buffer.buffered_samples >= buffer.min_samples:
+                remaining_chunk = np.concatenate(buffer.audio_buffer)
         
         del self.audio_buffers[stream_id]
         self.active_streams.discard(stream_id)
         
-        print(f"🛑 Stopped audio stream: {stream_id}", file=sys.stderr, flush=True)
+        if remaining_chunk is not None and self.final_chunk_handler:
+            logger.info(f"🔄 Processing final chunk for stream {stream_id}: {len(remaining_chunk)} samples")
+            self.final_chunk_handler(buffer, remaining_chunk)
+        
+        logger.info(f"🛑 Stopped audio stream: {stream_id}")
         return {"success": True}
     
-    def add_audio_chunk(self, stream_id: str, audio_data: bytes) -> Dict:
+    def add_audio_chunk(self, stream_id: str, audio_data: bytes, dtype: str = 'f32le') -> Dict:
         """Add audio data to a stream"""
         if stream_id not in self.audio_buffers:
             return {"success": False, "error": "Stream not found"}
+        if dtype not in ('f32le', 's16le'):
+            return {"success": False, "error": f"Unsupported audio dtype: {dtype}"}
         
-        self.audio_buffers[stream_id].add_audio_data(audio_data)
+        if self.audio_buffers[stream_id].add_audio_data(audio_data, dtype):
+            self.mark_stream_ready(stream_id)
         return {"success": True}
+    
+    def mark_stream_ready(self, stream_id: str) -> None:
+        """Wake the processing thread for a stream holding a full chunk"""
+        with self.ready_condition:
+            self.ready_streams.add(stream_id)
+            self.ready_condition.notify()
+    
+    def wait_for_ready_streams(self, timeout: float) -> List[str]:
+        """Block until a stream holds a full chunk, returning those streams.
+        
+        After `timeout` seconds with none, returns every active stream so chunks
+        that are due by time rather than size still get picked up.
+        """
+        with self.ready_condition:
+            self.ready_condition.wait_for(lambda: self.ready_streams or not self.running, timeout)
+            if self.ready_streams:
+                ready = list(self.ready_streams)
+                self.ready_streams.clear()
+                return ready
+        return list(self.active_streams)
+    
+    def shutdown(self) -> None:
+        """Stop processing and wake the processing thread so it can exit"""
+        with self.ready_condition:
+            self.running = False
+            self.ready_condition.notify_all()
+
+# Keyword configurations whose embeddings are kept between alert checks
+KEYWORD_CACHE_SIZE = 32
+# Transcript window embeddings kept between alert checks of a growing transcript
+WINDOW_CACHE_SIZE = 512
+ALERT_MODEL = "all-MiniLM-L6-v2"
+# ONNX Runtime threads for alert encodes, leaving the other cores to Whisper
+ALERT_ENCODER_THREADS = 2
+
+def alert_model_onnx_file() -> str:
+    """The int8-quantized ONNX export of the alert model suited to this CPU"""
+    if platform.machine().lower() in ('arm64', 'aarch64'):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
 
 class AlertMatcher:
     def __init__(self):
-        print("🤖 Initializing semantic alert matcher...", file=sys.stderr, flush=True)
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")  # 384-dim, fast
-        print("✅ Alert matcher initialized successfully", file=sys.stderr, flush=True)
+        logger.info("🤖 Initializing semantic alert matcher...")
+        # 384-dim, fast; the int8 ONNX Runtime export cuts encode latency on CPU
+        try:
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = ALERT_ENCODER_THREADS
+            session_options.inter_op_num_threads = 1
+            self.model = SentenceTransformer(ALERT_MODEL, backend="onnx",
+                                             model_kwargs={"file_name": alert_model_onnx_file(),
+                                                           "provider": "CPUExecutionProvider",
+                                                           "session_options": session_options})
+        except Exception as e:
+            logger.warning(f"⚠️ int8 ONNX alert model unavailable, using PyTorch: {e}")
+            self.model = SentenceTransformer(ALERT_MODEL)
+        # Keyword embeddings by ((keyword, threshold), ...); keyword lists rarely change
+        self._kw_cache = {}
+        # Last transcript and its windows; checks often repeat the same transcript
+        self._last_windows = (None, [])
+        # Window embeddings by window text
+        self._window_cache = {}
+        # The one shared encoder's fast tokenizer isn't safe to call from several
+        # threads at once ("Already borrowed"), so encodes take turns
+        self._encode_lock = threading.Lock()
+        logger.info("✅ Alert matcher initialized successfully")
     
     def check_keywords(self, transcript_text, keywords):
         """
@@ -243,47 +673,90 @@ class AlertMatcher:
             if not enabled_keywords:
                 return []
             
-            keyword_texts = [kw['keyword'] for kw in enabled_keywords]
-            keyword_thresholds = {kw['keyword']: kw['threshold'] for kw in enabled_keywords}
-            
-            # Pre-encode keywords if not already done
-            kw_vecs = self.model.encode(keyword_texts, normalize_embeddings=True)
+            keyword_texts, thresholds, kw_vecs = self._encode_keywords(enabled_keywords)
             
             # Process transcript in chunks with sliding window
-            window_size = 30  # words
-            overlap = 15  # 50% overlap
-            
-            tokens = transcript_text.lower().split()
+            chunks = self._transcript_windows(transcript_text)
             matches = []
             
-            for i in range(0, len(tokens), overlap):
-                chunk = " ".join(tokens[i:i+window_size])
-                if not chunk.strip():
-                    continue
-                
-                # Encode the chunk
-                chunk_vec = self.model.encode(chunk, normalize_embeddings=True)
-                
-                # Calculate similarities with all keywords
-                similarities = util.cos_sim(chunk_vec, kw_vecs)[0]
-                
-                # Check for matches above threshold
-                for j, (keyword, sim_score) in enumerate(zip(keyword_texts, similarities)):
-                    threshold = keyword_thresholds[keyword]
-                    if sim_score >= threshold:
-                        matches.append({
-                            'keyword': keyword,
-                            'text': chunk,
-                            'similarity': float(sim_score),
-                            'time': '00:00'  # You can implement time tracking if needed
-                        })
-                        break  # One alert per chunk to avoid spam
+            chunk_vecs = self._encode_windows(chunks)
+            
+            # Cosine similarity of every window with every keyword; both sides are
+            # normalized, so this is one matrix product
+            similarities = chunk_vecs @ kw_vecs.T
+            hits = similarities >= thresholds
+            
+            # One alert per chunk to avoid spam: the first keyword over its threshold
+            first_hits = hits.argmax(axis=1)
+            for i in np.flatnonzero(hits.any(axis=1)):
+                j = first_hits[i]
+                matches.append({
+                    'keyword': keyword_texts[j],
+                    'text': chunks[i],
+                    'similarity': float(similarities[i, j]),
+                    'time': '00:00'  # You can implement time tracking if needed
+                })
             
             return matches
             
         except Exception as e:
-            print(f"❌ Alert matching error: {e}", file=sys.stderr, flush=True)
+            logger.error(f"❌ Alert matching error: {e}")
             return []
+    
+    def encode(self, texts):
+        """Normalized embeddings of texts as a numpy array, safe to call from any thread"""
+        with self._encode_lock:
+            return self.model.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+    
+    def _transcript_windows(self, transcript_text):
+        """Split a transcript into lowercased sliding windows, reusing the last split"""
+        last_text, windows = self._last_windows
+        if transcript_text != last_text:
+            window_size = 30  # words
+            overlap = 15  # 50% overlap
+            
+            tokens = transcript_text.lower().split()
+            # Windows starting in the last `overlap` words would lie entirely inside the
+            # window before them, so they stop there (a short transcript is one window)
+            starts = range(0, max(len(tokens) - overlap, 1), overlap)
+            windows = [" ".join(tokens[i:i+window_size]) for i in starts]
+            self._last_windows = (transcript_text, windows)
+        return windows
+    
+    def _encode_windows(self, windows):
+        """Embeddings of transcript windows, encoding only windows not seen in earlier checks.
+        
+        Checks run on a growing transcript, so most windows were already encoded last time.
+        """
+        vecs = {window: self._window_cache.get(window) for window in windows}
+        new_windows = [window for window, vec in vecs.items() if vec is None]
+        if new_windows:
+            # Encode every new window in one batched call
+            new_vecs = self.encode(new_windows)
+            # Evict the oldest windows rather than clearing the cache, which would make the
+            # next check re-encode the whole transcript
+            excess = len(self._window_cache) + len(new_windows) - WINDOW_CACHE_SIZE
+            for old_window in list(itertools.islice(self._window_cache, max(excess, 0))):
+                del self._window_cache[old_window]
+            for window, vec in zip(new_windows, new_vecs):
+                vecs[window] = self._window_cache[window] = vec
+        return np.stack([vecs[window] for window in windows])
+    
+    def _encode_keywords(self, enabled_keywords):
+        """Return (keyword texts, threshold vector, embeddings), encoding only new keyword sets"""
+        key = tuple((kw['keyword'], kw['threshold']) for kw in enabled_keywords)
+        cached = self._kw_cache.get(key)
+        if cached is None:
+            keyword_texts = [kw['keyword'] for kw in enabled_keywords]
+            # Thresholds are looked up by keyword text, so a repeated keyword uses its last one
+            threshold_by_keyword = {kw['keyword']: kw['threshold'] for kw in enabled_keywords}
+            thresholds = np.array([threshold_by_keyword[text] for text in keyword_texts], dtype=np.float32)
+            kw_vecs = self.encode(keyword_texts)
+            if len(self._kw_cache) >= KEYWORD_CACHE_SIZE:
+                # Dicts keep insertion order, so the first key is the oldest keyword set
+                self._kw_cache.pop(next(iter(self._kw_cache)))
+            cached = self._kw_cache[key] = (keyword_texts, thresholds, kw_vecs)
+        return cached
 
 class TranscriptionSocketServer:
     def __init__(self, port=9001):
@@ -295,38 +768,69 @@ class TranscriptionSocketServer:
         if PRESERVE_TRANSCRIPTION_FILES:
             os.makedirs(PRESERVED_FILES_DIR, exist_ok=True)
             self.log_file_path = os.path.join(PRESERVED_FILES_DIR, 'transcription_log.txt')
-            print(f"📂 Transcription files will be preserved in: {PRESERVED_FILES_DIR}", file=sys.stderr, flush=True)
+            # Log entries are written by a background thread holding the file open, so
+            # transcription never waits on disk
+            self.transcription_log = queue.Queue()
+            self.log_thread = threading.Thread(target=self.write_transcription_log, daemon=True)
+            self.log_thread.start()
+            logger.info(f"📂 Transcription files will be preserved in: {PRESERVED_FILES_DIR}")
         
         try:
             self.lock_file = open(self.lock_file_path, 'w')
             fcntl.lockf(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
             self.lock_file.write(str(os.getpid()))
             self.lock_file.flush()
-            print(f"🔒 Acquired process lock: {self.lock_file_path}", file=sys.stderr, flush=True)
+            logger.info(f"🔒 Acquired process lock: {self.lock_file_path}")
             
             # Register cleanup function
             atexit.register(self.cleanup_lock)
         except (IOError, OSError) as e:
-            print(f"❌ Another transcription service is already running (lock file: {self.lock_file_path})", file=sys.stderr, flush=True)
+            logger.error(f"❌ Another transcription service is already running (lock file: {self.lock_file_path})")
             sys.exit(1)
         
-        print("🎤 Initializing Whisper model...", file=sys.stderr, flush=True)
+        logger.info(f"🎤 Initializing Whisper model on {WHISPER_DEVICE} ({WHISPER_COMPUTE_TYPE})...")
         
-        # Initialize Whisper model - using base model for balance of speed and accuracy
-        self.model = WhisperModel("small", device="cpu", compute_type="int8")
+        # Initialize Whisper model - distilled English model for balance of speed and accuracy
+        try:
+            self.model = WhisperModel(WHISPER_MODEL, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE,
+                                      cpu_threads=WHISPER_CPU_THREADS, num_workers=WHISPER_NUM_WORKERS)
+        except (RuntimeError, ValueError) as e:
+            if WHISPER_DEVICE == "cpu":
+                raise
+            # GPU present but unusable (driver, cuDNN, unsupported type): fall back to int8 on CPU
+            logger.warning(f"⚠️ Could not load Whisper on {WHISPER_DEVICE} ({e}), falling back to CPU int8")
+            self.model = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8",
+                                      cpu_threads=WHISPER_CPU_THREADS, num_workers=WHISPER_NUM_WORKERS)
         
-        # Initialize alert matcher
+        # Initialize alert matcher. Checks run on their own thread so a client's socket
+        # isn't held up by an encode; only each connection's newest check is kept waiting
         self.alert_matcher = AlertMatcher()
+        self.pending_alerts = {}  # conn -> (framed, transcript, keywords)
+        self.alert_condition = threading.Condition()
+        
+        # Initialize streaming server; audio left in a stopped stream is transcribed
+        # in the background so the stop reply isn't held up
+        self.streaming_server = StreamingTranscriptionServer(
+            final_chunk_handler=lambda buffer, chunk: self.transcription_pool.submit(self.finish_stream, buffer, chunk)
+        )
         
-        # Initialize streaming server
-        self.streaming_server = StreamingTranscriptionServer()
+        # Every transcription runs on this pool, one thread per model worker, so the
+        # number of concurrent decodes (and OpenMP threads) stays fixed under load.
+        # Requests aren't batched: BatchedInferencePipeline only batches the VAD
+        # segments of a single audio, and a live chunk fits in one 30s window
+        self.transcription_pool = ThreadPoolExecutor(max_workers=WHISPER_NUM_WORKERS, thread_name_prefix="transcribe")
+        # Client handlers only do socket I/O and wait on the transcription pool
+        self.client_pool = ThreadPoolExecutor(max_workers=MAX_CLIENT_CONNECTIONS, thread_name_prefix="client")
         
-        self.temp_dir = tempfile.mkdtemp()
-        self.chunk_counter = 0
+        # Chunk ids; next() on a count is atomic, so concurrent clients never share one
+        self.chunk_ids = itertools.count(1)
         self.port = port
         
-        print("✅ Whisper model initialized successfully", file=sys.stderr, flush=True)
-        print("🔌 Starting socket server...", file=sys.stderr, flush=True)
+        logger.info("✅ Whisper model initialized successfully")
+        
+        # Pay the first-call initialization cost now rather than on the first request
+        self.warm_up_models()
+        logger.info("🔌 Starting socket server...")
         
         # Create socket server with better error handling
         self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -335,127 +839,159 @@ class TranscriptionSocketServer:
         try:
             self.server.bind(('localhost', self.port))
             self.server.listen(5)
-            print(f"Socket server listening on port {self.port}", file=sys.stderr, flush=True)
+            logger.info(f"Socket server listening on port {self.port}")
             print("READY", flush=True)  # Signal to main process that we're ready
         except OSError as e:
             if e.errno == 48:  # Address already in use
-                print(f"❌ Port {self.port} is already in use", file=sys.stderr, flush=True)
+                logger.error(f"❌ Port {self.port} is already in use")
                 sys.exit(1)
             else:
                 raise e
         
         # Start processing thread for streaming audio
         self.start_processing_thread()
+        self.alert_thread = threading.Thread(target=self.process_alert_checks, daemon=True)
+        self.alert_thread.start()
+    
+    def warm_up_models(self):
+        """Run each model once on dummy input, before READY is signalled"""
+        logger.info("🔥 Warming up models...")
+        start = time.time()
+        try:
+            silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+            segments, _ = self.model.transcribe(silence, **WHISPER_DECODE_OPTIONS)
+            list(segments)  # Decoding is lazy
+            speech_timestamps(silence)
+            self.alert_matcher.encode(["warmup"])
+            logger.info(f"✅ Models warmed up in {time.time() - start:.1f}s")
+        except Exception as e:
+            logger.warning(f"⚠️ Model warm-up failed: {e}")
     
     def start_processing_thread(self):
         """Start background thread for processing streaming audio"""
         def process_streams():
             while self.streaming_server.running:
-                for stream_id in list(self.streaming_server.active_streams):
+                # Submit every stream's ready chunk before waiting on any, so chunks from
+                # different streams are decoded side by side on the model's workers
+                pending = []
+                for stream_id in self.streaming_server.wait_for_ready_streams(STREAM_POLL_INTERVAL_S):
                     if stream_id in self.streaming_server.audio_buffers:
                         buffer = self.streaming_server.audio_buffers[stream_id]
                         chunk = buffer.get_chunk_if_ready()
                         
                         if chunk is not None:
                             # Process chunk for transcription
-                            try:
-                                segments = self.transcribe_audio_chunk(chunk, buffer.stream_type, buffer.sample_rate)
-                                
-                                # Process segments through accumulator
-                                for segment in segments:
-                                    update = buffer.accumulator.add_segment(segment, buffer.stream_type)
-                                    if update:
-                                        # Broadcast update to clients
-                                        self.broadcast_transcript_update(update)
-                                
-                                # Check for timeout updates
-                                timeout_update = buffer.accumulator.check_timeout(buffer.stream_type)
-                                if timeout_update:
-                                    self.broadcast_transcript_update(timeout_update)
-                                    
-                            except Exception as e:
-                                print(f"❌ Error processing stream chunk: {e}", file=sys.stderr, flush=True)
+                            pending.append((buffer, self.transcription_pool.submit(
+                                self.transcribe_audio_chunk, chunk, buffer.stream_type, buffer.sample_rate,
+                                buffer.prompt_context, next(buffer.prompt_context.chunk_ids)
+                            )))
+                            # Audio sent faster than real time can leave another full chunk behind
+                            if buffer.buffered_samples >= buffer.chunk_samples:
+                                self.streaming_server.mark_stream_ready(stream_id)
                 
-                time.sleep(0.1)  # Small delay to prevent excessive CPU usage
+                for buffer, future in pending:
+                    try:
+                        self.accumulate_segments(buffer, future.result())
+                        
+                        # Check for timeout updates
+                        timeout_update = buffer.accumulator.check_timeout(buffer.stream_type)
+                        if timeout_update:
+                            self.broadcast_transcript_update(timeout_update)
+                            
+                    except Exception as e:
+                        logger.error(f"❌ Error processing stream chunk: {e}")
         
         self.processing_thread = threading.Thread(target=process_streams, daemon=True)
         self.processing_thread.start()
-        print("🚀 Started streaming processing thread", file=sys.stderr, flush=True)
+        logger.info("🚀 Started streaming processing thread")
     
-    def transcribe_audio_chunk(self, audio_chunk: np.ndarray, stream_type: str, sample_rate: int) -> List[TranscriptSegment]:
+    def accumulate_segments(self, buffer: AudioStreamBuffer, segments: List[TranscriptSegment]) -> None:
+        """Feed segments through a stream's accumulator, broadcasting completed sentences"""
+        for segment in segments:
+            update = buffer.accumulator.add_segment(segment, buffer.stream_type)
+            if update:
+                # Broadcast update to clients
+                self.broadcast_transcript_update(update)
+        
+        # Segments of a chunk arrive together, so the unfinished sentence goes out once
+        partial = buffer.accumulator.partial_update(buffer.stream_type)
+        if partial:
+            self.broadcast_transcript_update(partial)
+    
+    def finish_stream(self, buffer: AudioStreamBuffer, chunk: np.ndarray) -> None:
+        """Transcribe the audio left in a stopped stream and emit its unfinished sentence"""
+        try:
+            self.accumulate_segments(buffer, self.transcribe_audio_chunk(
+                chunk, buffer.stream_type, buffer.sample_rate,
+                buffer.prompt_context, next(buffer.prompt_context.chunk_ids)
+            ))
+            update = buffer.accumulator.flush(buffer.stream_type)
+            if update:
+                self.broadcast_transcript_update(update)
+        except Exception as e:
+            logger.error(f"❌ Error processing final {buffer.stream_type} chunk: {e}")
+    
+    def transcribe_audio_chunk(self, audio_chunk: np.ndarray, stream_type: str, sample_rate: int,
+                               context: PromptContext, chunk_id: int) -> List[TranscriptSegment]:
         """Transcribe an audio chunk and return segments"""
         try:
-            # Convert numpy array to WAV bytes for Whisper
-            wav_buffer = io.BytesIO()
-            
-            # Create WAV file in memory
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(sample_rate)
-                
-                # Convert float32 to int16
-                audio_int16 = (audio_chunk * 32767).astype(np.int16)
-                wav_file.writeframes(audio_int16.tobytes())
+            # Whisper takes float32 samples at 16kHz directly, with no WAV file in between
+            audio = np.ascontiguousarray(audio_chunk, dtype=np.float32)
+            if sample_rate != WHISPER_SAMPLE_RATE:
+                target_length = int(len(audio) * WHISPER_SAMPLE_RATE / sample_rate)
+                audio = np.interp(
+                    np.linspace(0, len(audio) - 1, target_length), np.arange(len(audio)), audio
+                ).astype(np.float32)
+            
+            # Near-silent chunks from either stream skip VAD and Whisper altogether
+            if len(audio) == 0:
+                return []
+            peak = max(audio.max(), -audio.min())
+            rms = np.sqrt(np.dot(audio, audio) / len(audio))
+            if peak < SILENT_CHUNK_PEAK and rms < SILENT_CHUNK_RMS:
+                logger.debug(f"🔇 Silent {stream_type} chunk (peak {peak:.4f}, RMS {rms:.4f}), skipping transcription")
+                return []
             
-            # Save to temporary file for Whisper
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(wav_buffer.getvalue())
-                temp_path = temp_file.name
+            # Microphone audio without speech never reaches the encoder; otherwise only
+            # its speech does, with segment times mapped back onto the chunk
+            speech_map = None
+            if stream_type != "system":
+                speech = speech_timestamps(audio)
+                if speech_duration_ms(speech) < MIN_SPEECH_MS:
+                    logger.debug(f"🔇 No speech in {stream_type} chunk, skipping transcription")
+                    return []
+                audio = speech_audio(audio, speech)
+                speech_map = SpeechTimestampsMap(speech, WHISPER_SAMPLE_RATE)
             
-            # Transcribe with appropriate settings
-            if stream_type == "system":
-                segments, info = self.model.transcribe(
-                    temp_path,
-                    beam_size=1,
-                    language="en",
-                    condition_on_previous_text=False,
-                    temperature=0.0,
-                    vad_filter=False
-                )
-            else:
-                segments, info = self.model.transcribe(
-                    temp_path,
-                    beam_size=1,
-                    language="en", 
-                    condition_on_previous_text=False,
-                    temperature=0.0,
-                    vad_filter=True,
-                    vad_parameters=dict(
-                        min_silence_duration_ms=1000,
-                        speech_pad_ms=400,
-                        max_speech_duration_s=30
-                    )
-                )
+            segments, info = self.model.transcribe(audio, initial_prompt=context.text, **TRANSCRIBE_OPTIONS)
             
             # Convert to TranscriptSegment objects
             result_segments = []
             for segment in segments:
                 if segment.text.strip():
+                    start_time, end_time = segment.start, segment.end
+                    if speech_map:
+                        start_time = speech_map.get_original_time(start_time)
+                        end_time = speech_map.get_original_time(end_time)
                     result_segments.append(TranscriptSegment(
                         text=segment.text.strip(),
-                        start_time=segment.start,
-                        end_time=segment.end
+                        start_time=start_time,
+                        end_time=end_time
                     ))
             
-            # Cleanup temp file
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-            
-            print(f"🗣️ Transcribed {len(result_segments)} segments from {stream_type} chunk", file=sys.stderr, flush=True)
+            logger.debug(f"🗣️ Transcribed {len(result_segments)} segments from {stream_type} chunk")
+            context.remember(" ".join(segment.text for segment in result_segments), chunk_id)
             return result_segments
             
         except Exception as e:
-            print(f"❌ Error transcribing audio chunk: {e}", file=sys.stderr, flush=True)
+            logger.error(f"❌ Error transcribing audio chunk: {e}")
             return []
     
     def broadcast_transcript_update(self, update: Dict):
         """Broadcast transcript update to all connected clients"""
         # This would be implemented to send updates to connected clients
         # For now, just log the update
-        print(f"📡 Broadcasting transcript update: {update}", file=sys.stderr, flush=True)
+        logger.info(f"📡 Broadcasting transcript update: {update}")
         
         # TODO: Implement client connection management to broadcast to all clients
         # This would require storing client connections and broadcasting updates
@@ -466,24 +1002,29 @@ class TranscriptionSocketServer:
             while True:
                 # Accept client connections
                 conn, addr = self.server.accept()
+                # Responses are small and latency-sensitive: don't let Nagle hold them back
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CLIENT_SNDBUF_BYTES)
+                conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, CLIENT_RCVBUF_BYTES)
                 
-                # Handle each client in a separate thread for concurrent processing
-                client_thread = threading.Thread(
-                    target=self.handle_client,
-                    args=(conn, addr)
-                )
-                client_thread.daemon = True
-                client_thread.start()
+                # Handle each client on the bounded client pool for concurrent processing
+                self.client_pool.submit(self.handle_client, conn, addr)
                 
         except KeyboardInterrupt:
-            print("\n🛑 Server shutting down...", file=sys.stderr, flush=True)
+            logger.info("🛑 Server shutting down...")
         finally:
             # Stop streaming server
             if hasattr(self, 'streaming_server'):
-                self.streaming_server.running = False
+                self.streaming_server.shutdown()
                 if self.processing_thread:
                     self.processing_thread.join(timeout=2)
             
+            self.client_pool.shutdown(wait=False, cancel_futures=True)
+            self.transcription_pool.shutdown(wait=False, cancel_futures=True)
+            if PRESERVE_TRANSCRIPTION_FILES:
+                # Let the log thread write out what's queued
+                self.transcription_log.put(None)
+                self.log_thread.join(timeout=2)
             self.server.close()
             self.cleanup_lock()
     
@@ -493,7 +1034,7 @@ class TranscriptionSocketServer:
             if self.lock_file:
                 self.lock_file.close()
                 os.unlink(self.lock_file_path)
-                print(f"🧹 Cleaned up lock file: {self.lock_file_path}", file=sys.stderr, flush=True)
+                logger.info(f"🧹 Cleaned up lock file: {self.lock_file_path}")
         except:
             pass
     
@@ -513,63 +1054,82 @@ class TranscriptionSocketServer:
                 "error": str(e)
             }
     
-    def convert_audio_to_wav(self, input_path):
-        """Convert any audio format to WAV using PyAV"""
-        try:
-            # Create output path
-            output_path = input_path.rsplit('.', 1)[0] + '_converted.wav'
-            
-            # Open input file
-            input_container = av.open(input_path)
-            
-            # Check if we have audio streams
-            audio_streams = [s for s in input_container.streams if s.type == 'audio']
+    def queue_alert_check(self, conn, framed: bool, transcript_text, keywords) -> None:
+        """Queue an alert check for the alert thread, replacing the connection's waiting one"""
+        with self.alert_condition:
+            superseded = self.pending_alerts.pop(conn, None)
+            self.pending_alerts[conn] = (framed, transcript_text, keywords)
+            self.alert_condition.notify()
+        
+        if superseded:
+            # Clients wait for a reply to every check; the newer transcript covers this one
+            send_response(conn, {"success": True, "matches": [], "superseded": True}, superseded[0])
+    
+    def process_alert_checks(self):
+        """Run queued alert checks, oldest connection first, and send back the results"""
+        while True:
+            with self.alert_condition:
+                self.alert_condition.wait_for(lambda: self.pending_alerts)
+                conn = next(iter(self.pending_alerts))
+                framed, transcript_text, keywords = self.pending_alerts.pop(conn)
+            
+            result = self.check_alerts(transcript_text, keywords)
+            try:
+                send_response(conn, result, framed)
+            except OSError as e:
+                logger.error(f"❌ Failed to send alert result: {e}")
+    
+    def decode_audio(self, input_path) -> Tuple[Optional[np.ndarray], str]:
+        """Decode any audio format to mono float32 samples at Whisper's rate using PyAV.
+        
+        Returns (samples, codec name); samples is None if the file has no audio stream.
+        Used in place of faster_whisper.decode_audio, which doesn't report the codec,
+        resamples frames that are already 16kHz mono, and runs gc.collect() per file.
+        """
+        with av.open(input_path) as container:
+            audio_streams = [s for s in container.streams if s.type == 'audio']
             if not audio_streams:
-                print(f"No audio stream found in {input_path}", file=sys.stderr, flush=True)
-                input_container.close()
-                return input_path
+                logger.warning(f"No audio stream found in {input_path}")
+                return None, "unknown"
             
             audio_stream = audio_streams[0]
+            codec_name = audio_stream.codec_context.name
             
-            # Open output file
-            output_container = av.open(output_path, 'w')
-            
-            # Add output stream
-            output_stream = output_container.add_stream('pcm_s16le', rate=16000)
-            output_stream.layout = 'mono'
+            # Created only once a frame needs converting: 16kHz mono float or PCM16
+            # frames are used as they are
+            resampler = None
             
-            # Create resampler
-            resampler = av.AudioResampler(
-                format='s16',
-                layout='mono',
-                rate=16000
-            )
-            
-            # Process frames
-            for frame in input_container.decode(audio_stream):
-                # Resample frame
-                resampled_frames = resampler.resample(frame)
-                
-                for resampled_frame in resampled_frames:
-                    for packet in output_stream.encode(resampled_frame):
-                        output_container.mux(packet)
-            
-            # Flush encoder
-            for packet in output_stream.encode():
-                output_container.mux(packet)
-            
-            input_container.close()
-            output_container.close()
-            
-            return output_path
+            chunks = []
+            for frame in container.decode(audio_stream):
+                if resampler is None:
+                    direct = _frame_to_float32(frame)
+                    if direct is not None:
+                        chunks.append(direct)
+                        continue
+                    # Packed float output, so each resampled frame is a single row of samples
+                    resampler = av.AudioResampler(
+                        format='flt',
+                        layout='mono',
+                        rate=WHISPER_SAMPLE_RATE
+                    )
+                for resampled_frame in resampler.resample(frame):
+                    chunks.append(resampled_frame.to_ndarray().reshape(-1))
             
-        except Exception as e:
-            print(f"❌ Audio conversion error: {e}", file=sys.stderr, flush=True)
-            # If conversion fails, try to use the original file
-            return input_path
+            # Flush the samples the resampler is still holding
+            if resampler is not None:
+                for resampled_frame in resampler.resample(None):
+                    chunks.append(resampled_frame.to_ndarray().reshape(-1))
+        
+        if not chunks:
+            return np.zeros(0, dtype=np.float32), codec_name
+        return np.concatenate(chunks), codec_name
     
-    def analyze_audio_content(self, audio_path: str, stream_type: str) -> dict:
-        """Analyze audio content to understand what's in the file"""
+    def analyze_audio_samples(self, samples: Optional[np.ndarray], audio_path: str, stream_type: str, audio_format: str) -> dict:
+        """Compute duration, level and silence statistics for decoded samples.
+        
+        Amplitudes are in 16-bit PCM units, matching analysis of a PCM16 WAV file, so
+        the silence thresholds in transcribe_chunk apply unchanged.
+        """
         analysis = {
             "has_audio": False,
             "duration": 0,
@@ -578,170 +1138,95 @@ class TranscriptionSocketServer:
             "max_amplitude": 0,
             "rms_level": 0,
             "silence_percentage": 100,
-            "audio_format": "unknown",
+            "audio_format": audio_format,
             "error": None
         }
         
-        try:
-            import av
-            container = av.open(audio_path)
-            audio_streams = [s for s in container.streams if s.type == 'audio']
-            
-            if not audio_streams:
-                analysis["error"] = "No audio streams found"
-                container.close()
-                return analysis
-            
-            audio_stream = audio_streams[0]
-            analysis["has_audio"] = True
-            analysis["duration"] = float(audio_stream.duration * audio_stream.time_base) if audio_stream.duration else 0
-            analysis["sample_rate"] = audio_stream.sample_rate
-            analysis["channels"] = audio_stream.channels
-            analysis["audio_format"] = audio_stream.codec.name
-            
-            # Analyze audio content by reading samples
-            frames_analyzed = 0
-            total_samples = 0
-            sum_squares = 0
-            max_amplitude = 0
-            silent_samples = 0
-            
-            # Read up to 5 seconds of audio for analysis
-            max_frames = int(5 * audio_stream.sample_rate) if audio_stream.sample_rate else 80000
-            
-            for frame in container.decode(audio_stream):
-                if frames_analyzed >= max_frames:
-                    break
-                    
-                # Convert frame to numpy array for analysis
-                audio_array = frame.to_ndarray()
-                if len(audio_array.shape) > 1:
-                    # Multi-channel: take mean across channels
-                    audio_array = audio_array.mean(axis=0)
-                
-                # Calculate statistics
-                frame_samples = len(audio_array)
-                total_samples += frame_samples
-                frames_analyzed += frame_samples
-                
-                # Calculate RMS and max amplitude
-                abs_samples = abs(audio_array)
-                max_amplitude = max(max_amplitude, abs_samples.max() if len(abs_samples) > 0 else 0)
-                sum_squares += (audio_array ** 2).sum()
-                
-                # Count silent samples (below threshold)
-                silence_threshold = 0.001  # 0.1% of max amplitude for better sensitivity
-                silent_samples += (abs_samples < silence_threshold).sum()
-            
-            container.close()
-            
-            if total_samples > 0:
-                analysis["max_amplitude"] = float(max_amplitude)
-                analysis["rms_level"] = float((sum_squares / total_samples) ** 0.5)
-                analysis["silence_percentage"] = float((silent_samples / total_samples) * 100)
-            
-            print(f"🔍 AUDIO ANALYSIS ({stream_type}): {os.path.basename(audio_path)}", file=sys.stderr, flush=True)
-            print(f"   Duration: {analysis['duration']:.2f}s, Sample Rate: {analysis['sample_rate']}Hz, Channels: {analysis['channels']}", file=sys.stderr, flush=True)
-            print(f"   Format: {analysis['audio_format']}, Max Amplitude: {analysis['max_amplitude']:.4f}", file=sys.stderr, flush=True)
-            print(f"   RMS Level: {analysis['rms_level']:.4f}, Silence: {analysis['silence_percentage']:.1f}%", file=sys.stderr, flush=True)
-            
-        except Exception as e:
-            analysis["error"] = str(e)
-            print(f"❌ AUDIO ANALYSIS ERROR ({stream_type}): {e}", file=sys.stderr, flush=True)
+        if samples is None:
+            analysis["error"] = "No audio streams found"
+            return analysis
+        
+        analysis["has_audio"] = True
+        analysis["duration"] = len(samples) / WHISPER_SAMPLE_RATE
+        analysis["sample_rate"] = WHISPER_SAMPLE_RATE
+        analysis["channels"] = 1
+        
+        # Look at up to 5 seconds of audio
+        window = samples[:5 * WHISPER_SAMPLE_RATE]
+        if len(window) > 0:
+            analysis["max_amplitude"] = float(max(window.max(), -window.min()) * 32768.0)
+            analysis["rms_level"] = float(np.sqrt(np.dot(window, window) / len(window)) * 32768.0)
+            # Silence threshold of 0.001 in PCM16 units
+            silent_samples = np.count_nonzero(np.abs(window) < 0.001 / 32768.0)
+            analysis["silence_percentage"] = float(silent_samples / len(window) * 100)
+        
+        logger.debug(f"🔍 AUDIO ANALYSIS ({stream_type}): {os.path.basename(audio_path)}")
+        logger.debug(f"   Duration: {analysis['duration']:.2f}s, Sample Rate: {analysis['sample_rate']}Hz, Channels: {analysis['channels']}")
+        logger.debug(f"   Format: {analysis['audio_format']}, Max Amplitude: {analysis['max_amplitude']:.4f}")
+        logger.debug(f"   RMS Level: {analysis['rms_level']:.4f}, Silence: {analysis['silence_percentage']:.1f}%")
         
         return analysis
     
-    def transcribe_chunk(self, audio_path, stream_type="microphone", conn=None):
+    def transcribe_chunk(self, audio_path, stream_type="microphone", conn=None, framed=False, chunk_id=None,
+                         context: Optional[PromptContext] = None):
         """Transcribe a single audio chunk quickly with stream identification"""
+        if chunk_id is None:
+            chunk_id = next(self.chunk_ids)
+        samples = None
+        audio_analysis = None
         try:
             if stream_type == 'system':
-                print(f"🔍 SYSTEM_AUDIO_DEBUG: Processing system audio chunk: {audio_path}", file=sys.stderr, flush=True)
+                logger.debug(f"🔍 SYSTEM_AUDIO_DEBUG: Processing system audio chunk: {audio_path}")
             else:
-                print(f"🔍 DEBUG: Processing {stream_type} chunk: {audio_path}", file=sys.stderr, flush=True)
+                logger.debug(f"🔍 DEBUG: Processing {stream_type} chunk: {audio_path}")
             
-            # Check if file exists and get size with retry for timing issues
-            file_exists = False
-            file_size = 0
-            max_retries = 3
-            retry_delay = 0.1  # 100ms delay
-            
-            for attempt in range(max_retries):
-                if os.path.exists(audio_path):
-                    try:
-                        file_size = os.path.getsize(audio_path)
-                        if file_size > 0:  # Make sure file is not empty
-                            file_exists = True
-                            break
-                    except (OSError, IOError) as e:
-                        print(f"⚠️ DEBUG: File access attempt {attempt + 1} failed: {e}", file=sys.stderr, flush=True)
-                
-                if attempt < max_retries - 1:  # Don't sleep on last attempt
-                    print(f"⏳ DEBUG: File not ready, waiting {retry_delay}s (attempt {attempt + 1}/{max_retries})", file=sys.stderr, flush=True)
-                    import time
-                    time.sleep(retry_delay)
+            # Clients only send a path once the chunk is complete (written and renamed
+            # into place), so one stat is enough - there is nothing to wait for
+            try:
+                file_size = os.path.getsize(audio_path)
+            except OSError:
+                file_size = 0
             
-            if not file_exists:
-                print(f"❌ DEBUG: Audio file does not exist after {max_retries} attempts: {audio_path}", file=sys.stderr, flush=True)
+            if not file_size:
+                logger.error(f"❌ DEBUG: Audio file does not exist or is empty: {audio_path}")
                 return {
                     "type": "error",
                     "message": f"Audio file does not exist: {audio_path}",
                     "stream_type": stream_type,
-                    "chunk_id": self.chunk_counter
+                    "chunk_id": chunk_id
                 }
             
-            print(f"📏 DEBUG: File size: {file_size} bytes (ready after retry)", file=sys.stderr, flush=True)
+            logger.debug(f"📏 DEBUG: File size: {file_size} bytes")
             
-            # Convert audio to WAV format if needed
-            original_path = audio_path
-            converted_file_created = False
-            if not audio_path.endswith('.wav'):
-                print(f"🔄 DEBUG: Converting {stream_type} audio to WAV format", file=sys.stderr, flush=True)
-                audio_path = self.convert_audio_to_wav(audio_path)
-                converted_file_created = (audio_path != original_path)
-                converted_size = os.path.getsize(audio_path) if os.path.exists(audio_path) else 0
-                print(f"📏 DEBUG: Converted file size: {converted_size} bytes", file=sys.stderr, flush=True)
+            # Decode once to 16kHz mono float32; analysis and Whisper both use these samples
+            logger.debug(f"🔄 DEBUG: Decoding {stream_type} audio")
+            samples, audio_format = self.decode_audio(audio_path)
             
             # Perform detailed audio analysis
-            audio_analysis = self.analyze_audio_content(audio_path, stream_type)
+            audio_analysis = self.analyze_audio_samples(samples, audio_path, stream_type, audio_format)
             
             # Check for basic audio validity
             if audio_analysis.get("error"):
-                print(f"❌ DEBUG: Audio analysis failed: {audio_analysis['error']}", file=sys.stderr, flush=True)
+                logger.error(f"❌ DEBUG: Audio analysis failed: {audio_analysis['error']}")
                 
                 # Preserve files with analysis errors for debugging
                 if PRESERVE_TRANSCRIPTION_FILES:
-                    preserved_path = self.preserve_transcription_file(audio_path, stream_type)
-                    self.log_transcription_file(audio_path, stream_type, f"ANALYSIS_ERROR: {audio_analysis['error']}", preserved_path, audio_analysis)
+                    preserved_path = self.preserve_transcription_audio(audio_path, samples, stream_type, chunk_id)
+                    self.log_transcription_file(audio_path, stream_type, chunk_id, f"ANALYSIS_ERROR: {audio_analysis['error']}", preserved_path, audio_analysis)
                 
-                return {
-                    "type": "transcript",
-                    "text": "",
-                    "stream_type": stream_type,
-                    "language": "en",
-                    "language_probability": 1.0,
-                    "duration": 0,
-                    "chunk_id": self.chunk_counter
-                }
+                return self.empty_transcript(stream_type, 0, chunk_id)
             
             # Check if audio has sufficient duration
             duration = audio_analysis.get("duration", 0)
             if duration < 0.05:  # Less than 50ms
-                print(f"⚠️ DEBUG: Audio duration too short: {duration:.2f}s", file=sys.stderr, flush=True)
+                logger.debug(f"⚠️ DEBUG: Audio duration too short: {duration:.2f}s")
                 
                 # Preserve short duration files for debugging
                 if PRESERVE_TRANSCRIPTION_FILES:
-                    preserved_path = self.preserve_transcription_file(audio_path, stream_type)
-                    self.log_transcription_file(audio_path, stream_type, f"SHORT_DURATION: {duration:.2f}s", preserved_path, audio_analysis)
+                    preserved_path = self.preserve_transcription_audio(audio_path, samples, stream_type, chunk_id)
+                    self.log_transcription_file(audio_path, stream_type, chunk_id, f"SHORT_DURATION: {duration:.2f}s", preserved_path, audio_analysis)
                 
-                return {
-                    "type": "transcript",
-                    "text": "",
-                    "stream_type": stream_type,
-                    "language": "en",
-                    "language_probability": 1.0,
-                    "duration": duration,
-                    "chunk_id": self.chunk_counter
-                }
+                return self.empty_transcript(stream_type, duration, chunk_id)
             
             # Check if audio is mostly silence
             silence_percentage = audio_analysis.get("silence_percentage", 100)
@@ -751,107 +1236,104 @@ class TranscriptionSocketServer:
             # Skip transcription if audio is too quiet or mostly silent
             # Relaxed thresholds for better live transcription sensitivity
             if silence_percentage > 99.5 or max_amplitude < 0.5 or rms_level < 0.05:
-                print(f"⚠️ DEBUG: Audio too quiet/silent - Silence: {silence_percentage:.1f}%, Max: {max_amplitude:.4f}, RMS: {rms_level:.4f}", file=sys.stderr, flush=True)
+                logger.debug(f"⚠️ DEBUG: Audio too quiet/silent - Silence: {silence_percentage:.1f}%, Max: {max_amplitude:.4f}, RMS: {rms_level:.4f}")
                 
                 # Preserve silent files for debugging
                 if PRESERVE_TRANSCRIPTION_FILES:
-                    preserved_path = self.preserve_transcription_file(audio_path, stream_type)
-                    self.log_transcription_file(audio_path, stream_type, f"MOSTLY_SILENT: {silence_percentage:.1f}%_silence", preserved_path, audio_analysis)
+                    preserved_path = self.preserve_transcription_audio(audio_path, samples, stream_type, chunk_id)
+                    self.log_transcription_file(audio_path, stream_type, chunk_id, f"MOSTLY_SILENT: {silence_percentage:.1f}%_silence", preserved_path, audio_analysis)
                 
-                return {
-                    "type": "transcript",
-                    "text": "",
-                    "stream_type": stream_type,
-                    "language": "en",
-                    "language_probability": 1.0,
-                    "duration": duration,
-                    "chunk_id": self.chunk_counter
-                }
+                return self.empty_transcript(stream_type, duration, chunk_id)
+            
+            # Skip Whisper for microphone audio with (almost) no speech; system audio
+            # stays VAD-free since VAD was found to drop valid system speech
+            if stream_type != "system":
+                speech = speech_timestamps(samples)
+                speech_ms = speech_duration_ms(speech)
+                if speech_ms < MIN_SPEECH_MS:
+                    logger.debug(f"⚠️ DEBUG: Too little speech for transcription: {speech_ms:.0f}ms")
+                    
+                    # Preserve speechless files for debugging
+                    if PRESERVE_TRANSCRIPTION_FILES:
+                        preserved_path = self.preserve_transcription_audio(audio_path, samples, stream_type, chunk_id)
+                        self.log_transcription_file(audio_path, stream_type, chunk_id, f"NO_SPEECH: {speech_ms:.0f}ms_speech", preserved_path, audio_analysis)
+                    
+                    return self.empty_transcript(stream_type, duration, chunk_id)
             
-            print(f"🎤 DEBUG: Starting Whisper transcription for {stream_type} audio", file=sys.stderr, flush=True)
+            logger.debug(f"🎤 DEBUG: Starting Whisper transcription for {stream_type} audio")
             
             # Log which VAD settings are being used
             if stream_type == "system":
-                print(f"⚙️ DEBUG: Using NO VAD for system audio (based on diagnostic findings)", file=sys.stderr, flush=True)
+                logger.debug(f"⚙️ DEBUG: Using NO VAD for system audio (based on diagnostic findings)")
             else:
-                print(f"⚙️ DEBUG: Using LESS AGGRESSIVE VAD for microphone audio (1000ms silence threshold)", file=sys.stderr, flush=True)
+                logger.debug(f"⚙️ DEBUG: Using LESS AGGRESSIVE VAD for microphone audio (1000ms silence threshold)")
             
-            # Fast transcription settings for near-live processing
+            # Fast transcription settings for near-live processing. File chunks are answered
+            # with plain text, so no timestamp tokens are decoded (segments then span
+            # whole 30s windows); streamed chunks keep them for sentence timing
             # Based on diagnostic testing, VAD is too aggressive and filters out valid speech
             # Different settings for system vs microphone audio
             if stream_type == "system":
-                print(f"🎵 SYSTEM_AUDIO_DEBUG: Starting Whisper transcription for system audio (NO VAD)", file=sys.stderr, flush=True)
+                logger.debug(f"🎵 SYSTEM_AUDIO_DEBUG: Starting Whisper transcription for system audio (NO VAD)")
                 # System audio often has different characteristics, disable VAD
-                segments, info = self.model.transcribe(
-                    audio_path,
-                    beam_size=1,  # Faster beam search
-                    language="en",
-                    condition_on_previous_text=False,
-                    temperature=0.0,
-                    vad_filter=False  # Disable VAD for system audio
-                )
+                segments, info = self.model.transcribe(samples, initial_prompt=context and context.text,
+                                                       without_timestamps=True, **TRANSCRIBE_OPTIONS)
             else:
-                # For microphone audio, use less aggressive VAD
-                segments, info = self.model.transcribe(
-                    audio_path,
-                    beam_size=1,  # Faster beam search
-                    language="en",
-                    condition_on_previous_text=False,
-                    temperature=0.0,
-                    vad_filter=True,
-                    vad_parameters=dict(
-                        min_silence_duration_ms=1000,  # Less aggressive (was 300ms)
-                        speech_pad_ms=400,             # More padding around speech
-                        max_speech_duration_s=30       # Allow longer speech segments
-                    )
-                )
+                # For microphone audio, only the speech the less aggressive VAD found above
+                segments, info = self.model.transcribe(speech_audio(samples, speech), initial_prompt=context and context.text,
+                                                       without_timestamps=True, **TRANSCRIBE_OPTIONS)
             
             if stream_type == "system":
-                print(f"📊 SYSTEM_AUDIO_DEBUG: Whisper info - Duration: {info.duration:.2f}s, Language: {info.language} ({info.language_probability:.2f})", file=sys.stderr, flush=True)
+                logger.debug(f"📊 SYSTEM_AUDIO_DEBUG: Whisper info - Duration: {info.duration:.2f}s, Language: {info.language} ({info.language_probability:.2f})")
             else:
-                print(f"📊 DEBUG: Whisper info - Duration: {info.duration:.2f}s, Language: {info.language} ({info.language_probability:.2f})", file=sys.stderr, flush=True)
+                logger.debug(f"📊 DEBUG: Whisper info - Duration: {info.duration:.2f}s, Language: {info.language} ({info.language_probability:.2f})")
             
             # Collect all segments quickly
-            transcription = ""
+            text_parts = []
             segment_count = 0
+            last_live_time = 0.0
             for segment in segments:
-                transcription += segment.text + " "
+                text_parts.append(segment.text.strip())
                 segment_count += 1
                 if stream_type == "system":
-                    print(f"🗣️ SYSTEM_AUDIO_DEBUG: Segment {segment_count}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)", file=sys.stderr, flush=True)
+                    logger.debug(f"🗣️ SYSTEM_AUDIO_DEBUG: Segment {segment_count}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)")
                 else:
-                    print(f"🗣️ DEBUG: Segment {segment_count}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)", file=sys.stderr, flush=True)
+                    logger.debug(f"🗣️ DEBUG: Segment {segment_count}: '{segment.text}' (start: {segment.start:.2f}s, end: {segment.end:.2f}s)")
                 
-                # Send live text updates via socket connection if available
+                # Send live text updates at most every LIVE_TEXT_INTERVAL_MS; the final
+                # transcript carries the full text, so a skipped update is never lost
+                now = time.monotonic()
+                if now - last_live_time < LIVE_TEXT_INTERVAL_MS / 1000.0:
+                    continue
+                last_live_time = now
                 live_update = {
                     "type": "live_text",
-                    "text": transcription.strip(),
+                    "text": " ".join(text_parts),
                     "stream_type": stream_type,
-                    "chunk_id": self.chunk_counter
+                    "chunk_id": chunk_id
                 }
                 
                 if conn:
                     try:
-                        response = json.dumps(live_update) + "\n"
-                        conn.send(response.encode())
-                        print(f"📡 TRANSCRIPTION: LIVE SENT: {live_update}", file=sys.stderr, flush=True)
+                        send_response(conn, live_update, framed)
+                        logger.debug(f"📡 TRANSCRIPTION: LIVE SENT: {live_update}")
                     except Exception as e:
-                        print(f"❌ TRANSCRIPTION: Failed to send live update: {e}", file=sys.stderr, flush=True)
+                        logger.error(f"❌ TRANSCRIPTION: Failed to send live update: {e}")
                 else:
                     # Log live update if no connection (for debugging)
-                    print(f"📡 TRANSCRIPTION: Live text update (no conn): {live_update}", file=sys.stderr, flush=True)
+                    logger.debug(f"📡 TRANSCRIPTION: Live text update (no conn): {live_update}")
             
-            final_text = transcription.strip()
+            final_text = " ".join(text_parts)
+            if context:
+                context.remember(final_text, chunk_id)
             if stream_type == "system":
-                print(f"✅ TRANSCRIPTION: Final system audio transcription: '{final_text}' (length: {len(final_text)})", file=sys.stderr, flush=True)
+                logger.info(f"✅ TRANSCRIPTION: Final system audio transcription: '{final_text}' (length: {len(final_text)})")
             else:
-                print(f"✅ TRANSCRIPTION: Final {stream_type} transcription: '{final_text}' (length: {len(final_text)})", file=sys.stderr, flush=True)
+                logger.info(f"✅ TRANSCRIPTION: Final {stream_type} transcription: '{final_text}' (length: {len(final_text)})")
             
             # Preserve and log the transcription file before cleanup
-            # Use the converted file if it was created, otherwise use the original
-            file_to_preserve = audio_path if converted_file_created else original_path
-            preserved_path = self.preserve_transcription_file(file_to_preserve, stream_type)
-            self.log_transcription_file(file_to_preserve, stream_type, final_text, preserved_path, audio_analysis)
+            preserved_path = self.preserve_transcription_audio(audio_path, samples, stream_type, chunk_id)
+            self.log_transcription_file(audio_path, stream_type, chunk_id, final_text, preserved_path, audio_analysis)
             
             return {
                 "type": "transcript",
@@ -859,76 +1341,67 @@ class TranscriptionSocketServer:
                 "stream_type": stream_type,  # Added stream identification
                 "language": info.language,
                 "language_probability": info.language_probability,
-                "duration": info.duration,
-                "chunk_id": self.chunk_counter
+                "duration": duration,  # The whole chunk's, not just the speech Whisper saw
+                "chunk_id": chunk_id
             }
             
         except Exception as e:
-            print(f"❌ DEBUG: Transcription error for {stream_type}: {e}", file=sys.stderr, flush=True)
+            logger.error(f"❌ DEBUG: Transcription error for {stream_type}: {e}")
             
             # Still preserve the file even if transcription failed for debugging
-            if PRESERVE_TRANSCRIPTION_FILES:
-                # Try to preserve the converted file if it exists, otherwise the original
-                file_to_preserve = audio_path if os.path.exists(audio_path) else original_path
-                if os.path.exists(file_to_preserve):
-                    # Try to get some basic audio analysis even on error
-                    try:
-                        error_analysis = self.analyze_audio_content(file_to_preserve, stream_type)
-                    except:
-                        error_analysis = None
-                    preserved_path = self.preserve_transcription_file(file_to_preserve, stream_type)
-                    self.log_transcription_file(file_to_preserve, stream_type, f"ERROR: {str(e)}", preserved_path, error_analysis)
+            if PRESERVE_TRANSCRIPTION_FILES and os.path.exists(audio_path):
+                # Log the analysis from before the failure, if it got that far; decoding
+                # the file again would most likely fail the same way
+                preserved_path = self.preserve_transcription_audio(audio_path, samples, stream_type, chunk_id)
+                self.log_transcription_file(audio_path, stream_type, chunk_id, f"ERROR: {str(e)}", preserved_path, audio_analysis)
             
             return {
                 "type": "error",
                 "message": str(e),
                 "stream_type": stream_type,  # Added stream identification
-                "chunk_id": self.chunk_counter
+                "chunk_id": chunk_id
             }
         finally:
-            # Clean up files - but only if preservation is disabled
-            if not PRESERVE_TRANSCRIPTION_FILES:
+            # Clean up the client's file - unless it's the copy being preserved
+            preserved_as_is = audio_path.endswith('.wav') or samples is None
+            if not PRESERVE_TRANSCRIPTION_FILES or not preserved_as_is:
                 try:
-                    # Clean up both original and converted files
-                    if os.path.exists(original_path):
-                        os.remove(original_path)
-                        print(f"🗑️ Cleaned up original file: {os.path.basename(original_path)}", file=sys.stderr, flush=True)
-                    if converted_file_created and os.path.exists(audio_path):
+                    if os.path.exists(audio_path):
                         os.remove(audio_path)
-                        print(f"🗑️ Cleaned up converted file: {os.path.basename(audio_path)}", file=sys.stderr, flush=True)
+                        logger.debug(f"🗑️ Cleaned up original file: {os.path.basename(audio_path)}")
                 except Exception as cleanup_error:
-                    print(f"⚠️ Error during file cleanup: {cleanup_error}", file=sys.stderr, flush=True)
-            else:
-                # When preserving, clean up the file we didn't preserve
-                try:
-                    if converted_file_created:
-                        # We preserved the converted file, so clean up the original
-                        if os.path.exists(original_path):
-                            os.remove(original_path)
-                            print(f"🗑️ Cleaned up original file (preserved converted): {os.path.basename(original_path)}", file=sys.stderr, flush=True)
-                    else:
-                        # We preserved the original file, check if there's a converted file to clean up
-                        converted_path = original_path.rsplit('.', 1)[0] + '_converted.wav'
-                        if os.path.exists(converted_path):
-                            os.remove(converted_path)
-                            print(f"🗑️ Cleaned up converted file (preserved original): {os.path.basename(converted_path)}", file=sys.stderr, flush=True)
-                except Exception as cleanup_error:
-                    print(f"⚠️ Error during selective file cleanup: {cleanup_error}", file=sys.stderr, flush=True)
+                    logger.warning(f"⚠️ Error during file cleanup: {cleanup_error}")
+    
+    def empty_transcript(self, stream_type: str, duration: float, chunk_id: int) -> Dict:
+        """Response for a chunk skipped before Whisper ran"""
+        return {
+            "type": "transcript",
+            "text": "",
+            "stream_type": stream_type,
+            "language": "en",
+            "language_probability": 1.0,
+            "duration": duration,
+            "chunk_id": chunk_id
+        }
     
-    def log_transcription_file(self, audio_path: str, stream_type: str, transcript: str, preserved_path: str = None, audio_analysis: dict = None):
+    def log_transcription_file(self, audio_path: str, stream_type: str, chunk_id: int, transcript: str, preserved_path: str = None, audio_analysis: dict = None):
         """Log transcription file details to a log file"""
         if not PRESERVE_TRANSCRIPTION_FILES:
             return
             
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            file_size = os.path.getsize(audio_path)
+        except OSError:
+            file_size = 0
+        
         log_entry = {
-            "timestamp": timestamp,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "original_path": audio_path,
             "preserved_path": preserved_path,
             "stream_type": stream_type,
             "transcript": transcript,
-            "file_size": os.path.getsize(audio_path) if os.path.exists(audio_path) else 0,
-            "chunk_id": self.chunk_counter
+            "file_size": file_size,
+            "chunk_id": chunk_id
         }
         
         # Add audio analysis data if available
@@ -944,15 +1417,25 @@ class TranscriptionSocketServer:
                 "has_audio": audio_analysis.get("has_audio", False)
             }
         
+        self.transcription_log.put(log_entry)
+        logger.debug(f"📝 Logged transcription file: {os.path.basename(audio_path)}")
+    
+    def write_transcription_log(self):
+        """Append queued log entries to the log file, flushing whenever the queue runs dry"""
         try:
             with open(self.log_file_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(log_entry) + '\n')
-            print(f"📝 Logged transcription file: {os.path.basename(audio_path)}", file=sys.stderr, flush=True)
+                while True:
+                    log_entry = self.transcription_log.get()
+                    if log_entry is None:
+                        break
+                    f.write(json.dumps(log_entry) + '\n')
+                    if self.transcription_log.empty():
+                        f.flush()
         except Exception as e:
-            print(f"❌ Error logging transcription file: {e}", file=sys.stderr, flush=True)
+            logger.error(f"❌ Error logging transcription file: {e}")
     
-    def preserve_transcription_file(self, audio_path: str, stream_type: str) -> str:
-        """Copy transcription file to preserved directory"""
+    def preserve_transcription_file(self, audio_path: str, stream_type: str, chunk_id: int) -> str:
+        """Link or copy transcription file into the preserved directory"""
         if not PRESERVE_TRANSCRIPTION_FILES or not os.path.exists(audio_path):
             return None
             
@@ -962,44 +1445,118 @@ class TranscriptionSocketServer:
             name, ext = os.path.splitext(filename)
             
             # Create a more descriptive filename
-            preserved_filename = f"{timestamp}_{stream_type}_{name}_{self.chunk_counter}{ext}"
+            preserved_filename = f"{timestamp}_{stream_type}_{name}_{chunk_id}{ext}"
             preserved_path = os.path.join(PRESERVED_FILES_DIR, preserved_filename)
             
-            # Copy the file
-            shutil.copy2(audio_path, preserved_path)
-            print(f"💾 Preserved transcription file: {preserved_filename}", file=sys.stderr, flush=True)
+            # Hard-link when both paths share a filesystem so nothing is copied; the
+            # client writes a fresh file per chunk, so the link never sees later writes
+            try:
+                os.link(audio_path, preserved_path)
+            except OSError:
+                shutil.copy2(audio_path, preserved_path)
+            logger.debug(f"💾 Preserved transcription file: {preserved_filename}")
             
             return preserved_path
         except Exception as e:
-            print(f"❌ Error preserving transcription file: {e}", file=sys.stderr, flush=True)
+            logger.error(f"❌ Error preserving transcription file: {e}")
             return None
     
+    def preserve_transcription_audio(self, audio_path: str, samples: Optional[np.ndarray], stream_type: str, chunk_id: int) -> str:
+        """Preserve a chunk as a WAV file.
+        
+        WAV inputs are copied as they are; other formats are written out from their
+        decoded samples as 16kHz mono PCM16, the audio Whisper actually processed.
+        """
+        if audio_path.endswith('.wav') or samples is None:
+            return self.preserve_transcription_file(audio_path, stream_type, chunk_id)
+        if not PRESERVE_TRANSCRIPTION_FILES:
+            return None
+            
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            name = os.path.splitext(os.path.basename(audio_path))[0]
+            preserved_filename = f"{timestamp}_{stream_type}_{name}_converted_{chunk_id}.wav"
+            preserved_path = os.path.join(PRESERVED_FILES_DIR, preserved_filename)
+            
+            # Scale and clip in one float32 scratch array before the int16 cast
+            scaled = np.multiply(samples, np.float32(32767.0), dtype=np.float32)
+            np.clip(scaled, -32768, 32767, out=scaled)
+            pcm = scaled.astype('<i2')
+            with wave.open(preserved_path, 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(WHISPER_SAMPLE_RATE)
+                wav_file.writeframes(pcm.tobytes())
+            logger.debug(f"💾 Preserved transcription file: {preserved_filename}")
+            
+            return preserved_path
+        except Exception as e:
+            logger.error(f"❌ Error preserving transcription file: {e}")
+            return None
+    
+    def handle_audio_path(self, conn, audio_path: str, prompt_contexts: Dict[str, PromptContext]) -> None:
+        """Transcribe an audio file sent as a bare path (legacy text protocol)"""
+        if not audio_path:
+            return
+        
+        # Detect stream type from filename if possible
+        stream_type = "microphone"  # default
+        if "_system" in audio_path.lower() or "system_audio" in audio_path.lower():
+            stream_type = "system"
+        elif "_mic" in audio_path.lower() or "microphone" in audio_path.lower():
+            stream_type = "microphone"
+        
+        logger.debug(f"🔄 Processing {stream_type}: {os.path.basename(audio_path)}")
+        
+        # Process the audio chunk
+        context = prompt_contexts.setdefault(stream_type, PromptContext())
+        result = self.transcription_pool.submit(
+            self.transcribe_chunk, audio_path, stream_type, conn, False, next(self.chunk_ids), context
+        ).result()
+        
+        # Send result back to client
+        send_response(conn, result)
+        
+        logger.debug(f"📤 Sent {stream_type}: {result.get('type', 'unknown')}")
+    
     def handle_client(self, conn, addr):
         """Handle client connection for audio processing and alert checking"""
-        print(f"📞 TRANSCRIPTION: Client connected from {addr}", file=sys.stderr, flush=True)
+        logger.info(f"📞 TRANSCRIPTION: Client connected from {addr}")
         
         # Store client connection for broadcasting updates
         client_streams = set()  # Track streams for this client
+        chunk_senders = {}  # stream_type -> ChunkResultSender for dual_stream_chunk results
+        # stream_type -> this connection's prompt context for file chunks; other clients'
+        # text never prompts this client's chunks
+        prompt_contexts = {}
+        reader = ClientMessageReader(conn)
         
         try:
             while True:
-                # Receive data
-                data = conn.recv(8192)  # Increased buffer size for dual stream data
-                if not data:
+                # Receive the next text line or binary frame
+                message = reader.read_message()
+                if message is None:
                     break
                 
+                # Binary frames are already decoded and get binary replies
+                framed = isinstance(message, dict)
+                
+                # Text lines that aren't a JSON object are audio file paths (legacy
+                # behavior); telling them apart by the first byte avoids a failed parse
+                if not framed and not message.lstrip().startswith(b'{'):
+                    self.handle_audio_path(conn, message.decode().strip(), prompt_contexts)
+                    continue
+                
                 try:
-                    # Try to parse as JSON for alert requests or dual stream processing
-                    request = json.loads(data.decode().strip())
+                    # Parse JSON for alert requests or dual stream processing
+                    request = message if framed else orjson.loads(message)
                     
                     if request.get('type') == 'check_alerts':
                         # Handle alert checking request
                         transcript_text = request.get('transcript', '')
                         keywords = request.get('keywords', [])
                         
-                        result = self.check_alerts(transcript_text, keywords)
-                        response = json.dumps(result) + "\n"
-                        conn.send(response.encode())
+                        self.queue_alert_check(conn, framed, transcript_text, keywords)
                         continue
                     
                     elif request.get('type') == 'start_stream':
@@ -1010,9 +1567,8 @@ class TranscriptionSocketServer:
                         result = self.streaming_server.start_stream(stream_id, stream_type)
                         client_streams.add(stream_id)
                         
-                        response = json.dumps(result) + "\n"
-                        conn.send(response.encode())
-                        print(f"🎬 Started stream {stream_id} for client {addr}", file=sys.stderr, flush=True)
+                        send_response(conn, result, framed)
+                        logger.info(f"🎬 Started stream {stream_id} for client {addr}")
                         continue
                     
                     elif request.get('type') == 'stop_stream':
@@ -1023,28 +1579,25 @@ class TranscriptionSocketServer:
                             result = self.streaming_server.stop_stream(stream_id)
                             client_streams.discard(stream_id)
                             
-                            response = json.dumps(result) + "\n"
-                            conn.send(response.encode())
-                            print(f"🛑 Stopped stream {stream_id} for client {addr}", file=sys.stderr, flush=True)
+                            send_response(conn, result, framed)
+                            logger.info(f"🛑 Stopped stream {stream_id} for client {addr}")
                         continue
                     
                     elif request.get('type') == 'stream_chunk':
                         # Handle streaming audio chunk (raw audio data)
                         stream_id = request.get('stream_id')
-                        audio_data = request.get('audio_data')  # Base64 encoded audio
+                        audio_data = request.get('audio_data')  # Raw bytes in frames, base64 in JSON
                         
                         if stream_id and audio_data:
-                            import base64
                             try:
-                                # Decode base64 audio data
-                                decoded_audio = base64.b64decode(audio_data)
-                                result = self.streaming_server.add_audio_chunk(stream_id, decoded_audio)
+                                # JSON clients base64-encode the audio
+                                if isinstance(audio_data, str):
+                                    audio_data = base64.b64decode(audio_data)
+                                result = self.streaming_server.add_audio_chunk(stream_id, audio_data, request.get('dtype', 'f32le'))
                                 
-                                response = json.dumps(result) + "\n"
-                                conn.send(response.encode())
+                                send_response(conn, result, framed)
                             except Exception as e:
-                                error_response = json.dumps({"success": False, "error": str(e)}) + "\n"
-                                conn.send(error_response.encode())
+                                send_response(conn, {"success": False, "error": str(e)}, framed)
                         continue
                     
                     elif request.get('type') == 'dual_stream_chunk':
@@ -1056,72 +1609,47 @@ class TranscriptionSocketServer:
                             continue
                         
                         if stream_type == 'system':
-                            print(f"🔄 SYSTEM_AUDIO_DEBUG: Processing system audio: {os.path.basename(audio_path)}", file=sys.stderr, flush=True)
-                            print(f"🔄 SYSTEM_AUDIO_DEBUG: File exists: {os.path.exists(audio_path)}, Size: {os.path.getsize(audio_path) if os.path.exists(audio_path) else 0} bytes", file=sys.stderr, flush=True)
+                            logger.debug(f"🔄 SYSTEM_AUDIO_DEBUG: Processing system audio: {os.path.basename(audio_path)}")
                         else:
-                            print(f"🔄 Processing {stream_type} audio: {os.path.basename(audio_path)}", file=sys.stderr, flush=True)
-                        
-                        self.chunk_counter += 1
-                        
-                        # Process the audio chunk with stream identification
-                        result = self.transcribe_chunk(audio_path, stream_type, conn)
+                            logger.debug(f"🔄 Processing {stream_type} audio: {os.path.basename(audio_path)}")
                         
-                        if stream_type == 'system':
-                            print(f"🎵 SYSTEM_AUDIO_DEBUG: Transcription result for system audio:", file=sys.stderr, flush=True)
-                            print(f"   Type: {result.get('type', 'unknown')}", file=sys.stderr, flush=True)
-                            print(f"   Text length: {len(result.get('text', ''))}", file=sys.stderr, flush=True)
-                            print(f"   Text preview: {result.get('text', '')[:100]}...", file=sys.stderr, flush=True)
-                            print(f"   Stream type: {result.get('stream_type', 'unknown')}", file=sys.stderr, flush=True)
-                        
-                        # Send result back to client
-                        response = json.dumps(result) + "\n"
-                        conn.send(response.encode())
-                        
-                        if stream_type == 'system':
-                            print(f"📤 SYSTEM_AUDIO_DEBUG: Sent system audio result: {result.get('type', 'unknown')}", file=sys.stderr, flush=True)
-                        else:
-                            print(f"📤 Sent {stream_type}: {result.get('type', 'unknown')}", file=sys.stderr, flush=True)
+                        # Queue the chunk and go back to reading, so the next chunk is
+                        # received while this one transcribes; its result is sent when ready
+                        if stream_type not in chunk_senders:
+                            chunk_senders[stream_type] = ChunkResultSender(conn)
+                            prompt_contexts.setdefault(stream_type, PromptContext())
+                        chunk_senders[stream_type].submit(
+                            self.transcription_pool, framed,
+                            self.transcribe_chunk, audio_path, stream_type, conn, framed, next(self.chunk_ids),
+                            prompt_contexts[stream_type]
+                        )
                         continue
                         
-                except json.JSONDecodeError:
-                    # Not JSON, treat as audio file path (legacy behavior)
-                    audio_path = data.decode().strip()
-                    if not audio_path:
-                        continue
-                    
-                    # Detect stream type from filename if possible
-                    stream_type = "microphone"  # default
-                    if "_system" in audio_path.lower() or "system_audio" in audio_path.lower():
-                        stream_type = "system"
-                    elif "_mic" in audio_path.lower() or "microphone" in audio_path.lower():
-                        stream_type = "microphone"
-                    
-                    print(f"🔄 Processing {stream_type}: {os.path.basename(audio_path)}", file=sys.stderr, flush=True)
-                    
-                    self.chunk_counter += 1
-                    
-                    # Process the audio chunk
-                    result = self.transcribe_chunk(audio_path, stream_type, conn)
-                    
-                    # Send result back to client
-                    response = json.dumps(result) + "\n"
-                    conn.send(response.encode())
-                    
-                    print(f"📤 Sent {stream_type}: {result.get('type', 'unknown')}", file=sys.stderr, flush=True)
+                except json.JSONDecodeError as e:
+                    logger.error(f"❌ Malformed JSON request: {e}")
+                    send_response(conn, {"type": "error", "message": f"Malformed JSON request: {e}"})
                 
         except Exception as e:
-            print(f"❌ Client error: {e}", file=sys.stderr, flush=True)
+            logger.error(f"❌ Client error: {e}")
         finally:
             # Clean up client streams when connection closes
             for stream_id in client_streams:
                 try:
                     self.streaming_server.stop_stream(stream_id)
-                    print(f"🧹 Cleaned up stream {stream_id} for disconnected client {addr}", file=sys.stderr, flush=True)
+                    logger.info(f"🧹 Cleaned up stream {stream_id} for disconnected client {addr}")
                 except:
                     pass
             
+            # Deliver results of chunks still transcribing before the connection closes
+            for sender in chunk_senders.values():
+                sender.wait()
+            
+            # Drop a waiting alert check; there's no one left to send it to
+            with self.alert_condition:
+                self.pending_alerts.pop(conn, None)
+            
             conn.close()
-            print(f"📞 Client {addr} disconnected", file=sys.stderr, flush=True)
+            logger.info(f"📞 Client {addr} disconnected")
     
 if __name__ == "__main__":
     # Use port 9001 to avoid conflicts
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Shared setup for the Whisper test scripts that run on preserved files
+Import this before faster_whisper: it sets the OpenMP thread default
+"""
+
+import os
+from pathlib import Path
+
+from cpu_cores import physical_cpu_count
+
+# One CTranslate2 thread per physical core; the OpenMP default has to be in place
+# before faster_whisper is imported
+CPU_THREADS = physical_cpu_count()
+os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
+
+# Files transcribed at once; CTranslate2 stops scaling well beyond ~4 threads per decode
+MAX_PARALLEL_FILES = 4
+
+def find_wav_files(directory):
+    """Split a directory's WAV files into (system, microphone, total WAV count) in one scan"""
+    system_files, microphone_files = [], []
+    wav_count = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(".wav"):
+                    continue
+                wav_count += 1
+                if "_system_" in name:
+                    system_files.append(Path(entry.path))
+                elif "_microphone_" in name:
+                    microphone_files.append(Path(entry.path))
+    except FileNotFoundError:
+        pass
+    return system_files, microphone_files, wav_count
+
+def run_captured(test, *args):
+    """Run a test, returning (result, logged lines) so parallel runs don't interleave output"""
+    lines = []
+    result = test(*args, log=lines.append)
+    return result, lines